@@ -0,0 +1,292 @@
+"""
+Verdict cache for Gemini HARO query analysis.
+Exact repeats are answered from memory or SQLite; near-duplicates are matched by
+embedding cosine similarity so rephrased reposts skip the Gemini call entirely.
+Stored verdicts expire after a TTL so relevance criteria changes eventually take effect.
+"""
+
+import hashlib
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+import datetime as dt
+from array import array
+from collections import OrderedDict
+from typing import Dict, Hashable, List, Optional, Sequence, Set, Tuple, Union
+
+import orjson
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+logger = logging.getLogger("gemini_cache")
+
+
+def cache_key(query_text: str, summary: str = "", category: str = "") -> str:
+    """Stable key for a (query_text, summary, category) triple."""
+    blob = "\x1f".join((query_text or "", summary or "", category or ""))
+    return hashlib.blake2b(blob.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def normalize(vector: Sequence[float]) -> Optional[List[float]]:
+    """Scale an embedding to unit length (None when it is all zeros)."""
+    norm = math.sqrt(sum(x * x for x in vector))
+    if not norm:
+        return None
+    return [x / norm for x in vector]
+
+
+def _decode_embedding(stored: Union[bytes, str]) -> Optional[List[float]]:
+    # Current rows hold normalized float32 blobs; older rows hold raw JSON arrays
+    if isinstance(stored, bytes):
+        return array("f", stored).tolist()
+    return normalize(orjson.loads(stored))
+
+
+def _parse_timestamp(stored: Optional[str]) -> float:
+    try:
+        return dt.datetime.fromisoformat(stored).timestamp()
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class VectorIndex:
+    """Unit embeddings searchable by cosine similarity.
+
+    With numpy the vectors are rows of one float32 matrix, so a search is a single
+    matrix-vector product; without it they are plain lists scanned in Python.
+    Callers provide their own locking.
+    """
+
+    def __init__(self):
+        self._vectors: List[List[float]] = []
+        self._matrix = None
+        self._scores = None
+        self.keys: List[Hashable] = []
+        self._key_set: Set[Hashable] = set()
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._key_set
+
+    def add(self, key: Hashable, vector: List[float]) -> None:
+        """Append a normalized embedding."""
+        if np is None:
+            self._vectors.append(vector)
+        else:
+            count = len(self.keys)
+            if self._matrix is None:
+                self._matrix = np.empty((64, len(vector)), dtype=np.float32)
+            elif len(vector) != self._matrix.shape[1]:
+                logger.warning("Skipping cached embedding with dimension %d (expected %d)", len(vector), self._matrix.shape[1])
+                return
+            if count == self._matrix.shape[0]:
+                grown = np.empty((count * 2, self._matrix.shape[1]), dtype=np.float32)
+                grown[:count] = self._matrix
+                self._matrix = grown
+            self._matrix[count] = vector
+            if self._scores is None or self._scores.shape[0] < self._matrix.shape[0]:
+                self._scores = np.empty(self._matrix.shape[0], dtype=np.float32)
+        self.keys.append(key)
+        self._key_set.add(key)
+
+    def nearest(self, query: List[float]) -> Tuple[float, Optional[Hashable]]:
+        """Return (similarity, key) of the closest stored vector to a normalized query."""
+        if np is not None:
+            count = len(self.keys)
+            if not count or len(query) != self._matrix.shape[1]:
+                return -1.0, None
+            # One matrix-vector product over every stored embedding, into a reused buffer
+            scores = self._scores[:count]
+            np.dot(self._matrix[:count], np.asarray(query, dtype=np.float32), out=scores)
+            best = int(scores.argmax())
+            return float(scores[best]), self.keys[best]
+        best_score, best_key = -1.0, None
+        for key, stored in zip(self.keys, self._vectors):
+            score = sum(a * b for a, b in zip(stored, query))
+            if score > best_score:
+                best_score, best_key = score, key
+        return best_score, best_key
+
+    def remove(self, drop: Set[Hashable]) -> None:
+        """Drop the vectors stored under any of ``drop``."""
+        keep = [i for i, key in enumerate(self.keys) if key not in drop]
+        if len(keep) == len(self.keys):
+            return
+        if np is None:
+            self._vectors = [self._vectors[i] for i in keep]
+        elif keep:
+            self._matrix[:len(keep)] = self._matrix[keep]
+        self.keys = [self.keys[i] for i in keep]
+        self._key_set = set(self.keys)
+
+
+class VerdictCache:
+    """Two-tier cache of Gemini verdicts: exact key lookups and semantic neighbours."""
+
+    def __init__(
+        self, path: str, semantic_threshold: float = 0.97, max_memory_entries: int = 4096, ttl_days: float = 30.0
+    ):
+        self.semantic_threshold = semantic_threshold
+        self.ttl_days = ttl_days
+        self.max_memory_entries = max_memory_entries
+        self._lock = threading.Lock()
+        # key -> (analysis, created_at as epoch seconds)
+        self._memory: "OrderedDict[str, Tuple[Dict, float]]" = OrderedDict()
+        self._index = VectorIndex()
+        self._vector_created: Dict[str, float] = {}
+        # Creation time of the oldest entry held in memory or the index; a purge is due once the cutoff passes it
+        self._oldest_created = math.inf
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS verdicts (
+                key TEXT PRIMARY KEY,
+                analysis BLOB,
+                embedding BLOB,
+                created_at TEXT
+            )
+            """
+        )
+        self._conn.commit()
+        self._purge_expired()
+        self._load_embeddings()
+
+    @property
+    def semantic_enabled(self) -> bool:
+        return 0.0 < self.semantic_threshold <= 1.0
+
+    def _cutoff(self) -> float:
+        """Oldest creation time (epoch seconds) still served; -inf when entries never expire."""
+        if self.ttl_days <= 0:
+            return -math.inf
+        return time.time() - self.ttl_days * 86400
+
+    def _purge_expired(self) -> None:
+        """Delete expired rows and forget their memory entries and vectors; callers hold the lock."""
+        cutoff = self._cutoff()
+        if cutoff == -math.inf:
+            return
+        cutoff_text = dt.datetime.fromtimestamp(cutoff, dt.timezone.utc).isoformat()
+        deleted = self._conn.execute(
+            "DELETE FROM verdicts WHERE created_at < ? OR created_at IS NULL", (cutoff_text,)
+        ).rowcount
+        self._conn.commit()
+        for key in [key for key, (_, created) in self._memory.items() if created < cutoff]:
+            del self._memory[key]
+        expired = {key for key, created in self._vector_created.items() if created < cutoff}
+        if expired:
+            self._index.remove(expired)
+            for key in expired:
+                del self._vector_created[key]
+        self._oldest_created = min(
+            [created for _, created in self._memory.values()] + list(self._vector_created.values()),
+            default=math.inf,
+        )
+        if deleted:
+            logger.info("Expired %d cached verdicts older than %g days", deleted, self.ttl_days)
+
+    def _purge_if_due(self) -> None:
+        if self._oldest_created < self._cutoff():
+            self._purge_expired()
+
+    def _load_embeddings(self) -> None:
+        rows = self._conn.execute(
+            "SELECT key, embedding, created_at FROM verdicts WHERE embedding IS NOT NULL"
+        ).fetchall()
+        for key, embedding, created_at in rows:
+            vector = _decode_embedding(embedding)
+            if vector:
+                self._add_vector(key, vector, _parse_timestamp(created_at))
+        logger.info("Loaded %d cached verdict embeddings", len(self._index))
+
+    def _add_vector(self, key: str, vector: List[float], created: float) -> None:
+        """Index a normalized embedding; callers hold the lock (or are still in __init__)."""
+        self._index.add(key, vector)
+        if key in self._index:
+            self._vector_created[key] = created
+            self._oldest_created = min(self._oldest_created, created)
+
+    def _remember(self, key: str, analysis: Dict, created: float) -> None:
+        self._memory[key] = (analysis, created)
+        self._memory.move_to_end(key)
+        self._oldest_created = min(self._oldest_created, created)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _get_locked(self, key: str) -> Optional[Dict]:
+        entry = self._memory.get(key)
+        if entry is not None:
+            analysis, created = entry
+            if created >= self._cutoff():
+                self._memory.move_to_end(key)
+                return analysis
+            del self._memory[key]
+            return None
+        row = self._conn.execute(
+            "SELECT analysis, created_at FROM verdicts WHERE key = ?", (key,)
+        ).fetchone()
+        if not row:
+            return None
+        created = _parse_timestamp(row[1])
+        if created < self._cutoff():
+            return None
+        analysis = orjson.loads(row[0])
+        self._remember(key, analysis, created)
+        return analysis
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Return the cached, unexpired verdict for an exact key, if any."""
+        with self._lock:
+            return self._get_locked(key)
+
+    def get_similar(self, vector: Sequence[float]) -> Optional[Dict]:
+        """Return the verdict of the most similar live cached query above the threshold."""
+        if not self.semantic_enabled:
+            return None
+        query = normalize(vector)
+        if not query:
+            return None
+        with self._lock:
+            self._purge_if_due()
+            best_score, best_key = self._index.nearest(query)
+            if best_key is None or best_score < self.semantic_threshold:
+                return None
+            analysis = self._get_locked(best_key)
+        if analysis is not None:
+            logger.info("Semantic cache hit (similarity=%.3f)", best_score)
+        return analysis
+
+    def put(self, key: str, analysis: Dict, vector: Optional[Sequence[float]] = None) -> None:
+        """Store a verdict (and optionally its embedding) in memory and on disk."""
+        normalized = normalize(vector) if vector else None
+        now = time.time()
+        with self._lock:
+            self._purge_if_due()
+            self._remember(key, analysis, now)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO verdicts (key, analysis, embedding, created_at) VALUES (?, ?, ?, ?)",
+                (
+                    key,
+                    orjson.dumps(dict(analysis)),
+                    array("f", normalized).tobytes() if normalized else None,
+                    dt.datetime.fromtimestamp(now, dt.timezone.utc).isoformat(),
+                ),
+            )
+            self._conn.commit()
+            if normalized:
+                if key in self._index:
+                    self._vector_created[key] = now
+                else:
+                    self._add_vector(key, normalized, now)
@@ -3,26 +3,158 @@ Gemini-powered HARO query filtering system.
 Uses AI to intelligently analyze queries for relevance to specified topics.
 """
 
-from dotenv import load_dotenv
-load_dotenv()
-
 import os
-import json
+import re
+import asyncio
+import functools
 import logging
-from typing import Dict, List, Optional, Tuple
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional, Tuple
 import google.generativeai as genai
+import orjson
+from dotenv import load_dotenv
+from tenacity import AsyncRetrying, retry_if_exception_message, stop_after_attempt, wait_exponential_jitter
+
+from gemini_cache import VectorIndex, VerdictCache, cache_key, normalize
+from gemini_rate_limit import RateLimiterRegistry
+
+try:
+    import ahocorasick  # pyahocorasick
+except ImportError:  # pragma: no cover
+    ahocorasick = None
 
 logger = logging.getLogger("gemini_filter")
 
 # Configuration
-USE_GEMINI_FILTERING = os.getenv("USE_GEMINI_FILTERING", "true").lower() == "true"
-GEMINI_FILTER_MODEL = os.getenv("GEMINI_FILTER_MODEL", "gemini-2.5-flash")
-GEMINI_FILTER_THRESHOLD = float(os.getenv("GEMINI_FILTER_THRESHOLD", "0.85"))
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "")
-GEMINI_CONFIDENCE_THRESHOLD = float(os.getenv("GEMINI_CONFIDENCE_THRESHOLD", "0.75"))
+@dataclass(frozen=True, slots=True)
+class FilterConfig:
+    use_filtering: bool
+    filter_model: str
+    filter_threshold: float
+    api_key: str
+    confidence_threshold: float
+    batch_size: int
+    keyword_prefilter: bool
+    max_concurrency: int
+    timeout_seconds: float
+    rpm: int
+    # Verdict cache configuration (exact + semantic)
+    use_cache: bool
+    cache_path: str
+    cache_ttl_days: float
+    embedding_model: str
+    semantic_cache_threshold: float
+    prewarm: bool
+    hedge_ms: int
+
+    @property
+    def filter_models(self) -> Tuple[str, ...]:
+        # Primary model first, then the fallback used when it errors or runs out of quota
+        return (self.filter_model, "gemini-1.5-flash")
+
+    @classmethod
+    def from_env(cls) -> "FilterConfig":
+        return cls(
+            use_filtering=os.getenv("USE_GEMINI_FILTERING", "true").lower() == "true",
+            filter_model=os.getenv("GEMINI_FILTER_MODEL", "gemini-2.5-flash"),
+            filter_threshold=float(os.getenv("GEMINI_FILTER_THRESHOLD", "0.85")),
+            api_key=os.getenv("GEMINI_API_KEY", ""),
+            confidence_threshold=float(os.getenv("GEMINI_CONFIDENCE_THRESHOLD", "0.75")),
+            batch_size=max(1, int(os.getenv("GEMINI_BATCH_SIZE", "16"))),
+            keyword_prefilter=os.getenv("USE_GEMINI_KEYWORD_PREFILTER", "true").lower() == "true",
+            max_concurrency=max(1, int(os.getenv("GEMINI_MAX_CONCURRENCY", "32"))),
+            timeout_seconds=float(os.getenv("GEMINI_TIMEOUT_SECONDS", "30")),
+            rpm=int(os.getenv("GEMINI_RPM", "60")),
+            use_cache=os.getenv("USE_GEMINI_CACHE", "true").lower() == "true",
+            cache_path=os.getenv("GEMINI_CACHE_PATH", "data/gemini_cache.db"),
+            cache_ttl_days=float(os.getenv("GEMINI_CACHE_TTL_DAYS", "30")),
+            embedding_model=os.getenv("GEMINI_EMBEDDING_MODEL", "models/text-embedding-004"),
+            semantic_cache_threshold=float(os.getenv("GEMINI_SEMANTIC_CACHE_THRESHOLD", "0.97")),
+            prewarm=os.getenv("USE_GEMINI_PREWARM", "true").lower() == "true",
+            hedge_ms=int(os.getenv("GEMINI_HEDGE_MS", "0")),
+        )
+
+_config: Optional[FilterConfig] = None
+
+def init(load_env: bool = True) -> FilterConfig:
+    """Load .env (optionally), read the filter configuration and configure the Gemini SDK."""
+    global _config
+    if load_env:
+        load_dotenv()
+    config = FilterConfig.from_env()
+    # Configure the SDK once; models reuse its client instead of rebuilding it per call
+    if config.api_key:
+        genai.configure(api_key=config.api_key)
+    _config = config
+    return config
+
+_warmup_started = False
+_warmup_lock = threading.Lock()
+
+def start_warmup() -> None:
+    """Prewarm the filter model's connection in the background, at most once per process.
+
+    Called by the bot at startup rather than from init(), so importing this module (or
+    re-reading the configuration) never makes a network call.
+    """
+    global _warmup_started
+    config = get_config()
+    if not (config.prewarm and config.use_filtering and config.api_key):
+        return
+    with _warmup_lock:
+        if _warmup_started:
+            return
+        _warmup_started = True
+    threading.Thread(target=_warmup, args=(config.filter_model,), daemon=True, name="gemini-warmup").start()
+
+def _warmup(model_name: str) -> None:
+    """Open the Gemini connection (DNS, TLS, HTTP/2) before the first real request needs it."""
+    try:
+        # count_tokens rides the same client channel as generate_content but is not billed
+        _get_model(model_name).count_tokens("ping")
+        logger.info("Gemini connection prewarmed for %s", model_name)
+    except Exception as e:
+        logger.warning("Gemini prewarm failed for %s: %s", model_name, e)
+
+def get_config() -> FilterConfig:
+    """Return the active configuration, initializing from the environment on first use."""
+    return _config or init()
+
+# Module-level names kept for existing importers (e.g. ``from gemini_filter import USE_GEMINI_FILTERING``)
+_CONFIG_ALIASES = {
+    "USE_GEMINI_FILTERING": "use_filtering",
+    "GEMINI_FILTER_MODEL": "filter_model",
+    "GEMINI_FILTER_THRESHOLD": "filter_threshold",
+    "GEMINI_API_KEY": "api_key",
+    "GEMINI_CONFIDENCE_THRESHOLD": "confidence_threshold",
+    "GEMINI_BATCH_SIZE": "batch_size",
+    "USE_GEMINI_KEYWORD_PREFILTER": "keyword_prefilter",
+    "GEMINI_MAX_CONCURRENCY": "max_concurrency",
+    "GEMINI_TIMEOUT_SECONDS": "timeout_seconds",
+    "GEMINI_RPM": "rpm",
+    "FILTER_MODELS": "filter_models",
+    "USE_GEMINI_CACHE": "use_cache",
+    "GEMINI_CACHE_PATH": "cache_path",
+    "GEMINI_CACHE_TTL_DAYS": "cache_ttl_days",
+    "GEMINI_EMBEDDING_MODEL": "embedding_model",
+    "GEMINI_SEMANTIC_CACHE_THRESHOLD": "semantic_cache_threshold",
+    "USE_GEMINI_PREWARM": "prewarm",
+    "GEMINI_HEDGE_MS": "hedge_ms",
+}
+
+def __getattr__(name: str) -> Any:
+    attr = _CONFIG_ALIASES.get(name)
+    if attr is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(get_config(), attr)
 
 # Topic definitions for Gemini analysis
-TOPIC_DEFINITIONS = {
+_TOPIC_DEFINITIONS = {
     "artificial_intelligence": {
         "name": "Artificial Intelligence & Machine Learning",
         "description": "AI, machine learning, automation, chatbots, neural networks, deep learning, predictive analytics, generative AI, intelligent systems, cognitive computing, smart technology, robotics",
@@ -50,15 +182,180 @@ TOPIC_DEFINITIONS = {
     }
 }
 
-def create_gemini_filter_prompt(query_text: str, summary: str = "", category: str = "") -> str:
-    """Create a prompt for Gemini to analyze HARO query relevance."""
-    
-    topics_text = "\n".join([
-        f"- {topic['name']}: {topic['description']}"
-        for topic in TOPIC_DEFINITIONS.values()
-    ])
-    
-    prompt = f"""
+# Parallel per-topic tuples (index i = bit i in topic masks); hot paths read these, not the dicts
+TOPIC_KEYS: Tuple[str, ...] = tuple(_TOPIC_DEFINITIONS)
+TOPIC_NAMES: Tuple[str, ...] = tuple(t["name"] for t in _TOPIC_DEFINITIONS.values())
+TOPIC_DESCRIPTIONS: Tuple[str, ...] = tuple(t["description"] for t in _TOPIC_DEFINITIONS.values())
+TOPIC_KEYWORDS: Tuple[Tuple[str, ...], ...] = tuple(
+    tuple(kw.lower() for kw in t["keywords"]) for t in _TOPIC_DEFINITIONS.values()
+)
+ALL_TOPICS_MASK = (1 << len(TOPIC_KEYS)) - 1
+
+# Read-only view kept for callers that still look topics up by key
+TOPIC_DEFINITIONS: Mapping[str, Mapping[str, Any]] = MappingProxyType({
+    key: MappingProxyType({"name": name, "description": description, "keywords": keywords})
+    for key, name, description, keywords in zip(TOPIC_KEYS, TOPIC_NAMES, TOPIC_DESCRIPTIONS, TOPIC_KEYWORDS)
+})
+del _TOPIC_DEFINITIONS
+
+# Keyword index: every keyword maps to a bitmask of the topics that list it
+KEYWORD_TOPIC_MASKS: Dict[str, int] = {}
+for _bit, _keywords in enumerate(TOPIC_KEYWORDS):
+    for _kw in _keywords:
+        KEYWORD_TOPIC_MASKS[_kw] = KEYWORD_TOPIC_MASKS.get(_kw, 0) | (1 << _bit)
+
+# Regex fallback when pyahocorasick is unavailable: any keyword as a whole word
+TOPIC_KEYWORD_RE = re.compile(
+    r"\b(?:"
+    + "|".join(re.escape(kw) for kw in sorted(KEYWORD_TOPIC_MASKS, key=len, reverse=True))
+    + r")\b",
+    re.IGNORECASE,
+)
+
+# One Aho-Corasick automaton finds every keyword (and its topics) in a single pass
+_keyword_automaton = None
+if ahocorasick is not None:
+    _keyword_automaton = ahocorasick.Automaton()
+    for _kw, _mask in KEYWORD_TOPIC_MASKS.items():
+        _keyword_automaton.add_word(_kw, (len(_kw), _mask))
+    _keyword_automaton.make_automaton()
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+def match_topic_mask(text: str) -> int:
+    """Return the bitmask of topics whose keywords appear in ``text`` as whole words."""
+    text = text.lower()
+    mask = 0
+    if _keyword_automaton is not None:
+        last = len(text) - 1
+        for end, (length, kw_mask) in _keyword_automaton.iter(text):
+            start = end - length + 1
+            if (start == 0 or not _is_word_char(text[start - 1])) and (
+                end == last or not _is_word_char(text[end + 1])
+            ):
+                mask |= kw_mask
+    else:
+        for m in TOPIC_KEYWORD_RE.finditer(text):
+            mask |= KEYWORD_TOPIC_MASKS[m.group(0)]
+    return mask
+
+
+def _prompt_topic_mask(query_text: str, summary: str, category: str) -> int:
+    """Topics worth listing in the prompt; all of them when no keyword matched."""
+    return match_topic_mask(f"{summary} {category} {query_text}") or ALL_TOPICS_MASK
+
+# Short fields first, free-text reasoning last
+REQUIRED_FIELDS = ("relevant", "relevance_score", "confidence", "matching_topics", "reasoning")
+_REQUIRED_FIELD_SET = frozenset(REQUIRED_FIELDS)
+
+FILTER_GUIDELINES = """Guidelines:
+- Be strict about relevance; prefer precision over recall. If unsure, set relevant=false.
+- Do not infer relevance from generic business language. Require explicit topical signals (direct mentions) or two strong implicit signals.
+- Scoring: 0.85–1.0 = clearly relevant; 0.65–0.84 = borderline; <0.65 = not relevant.
+- Confidence must reflect evidence. Lower confidence when signals are weak, ambiguous, or generic.
+- Only include topics that genuinely match. If none match, use an empty array."""
+
+# Shared read-only verdicts for the no-RPC paths; they are returned as-is, never copied
+DISABLED_RESULT: Mapping[str, Any] = MappingProxyType({
+    "relevant": False,
+    "relevance_score": 0.0,
+    "matching_topics": (),
+    "reasoning": "Gemini filtering disabled",
+    "confidence": 0.0
+})
+
+FALLBACK_RESULT: Mapping[str, Any] = MappingProxyType({
+    "relevant": False,
+    "relevance_score": 0.0,
+    "matching_topics": (),
+    "reasoning": "Analysis failed, defaulting to exclude",
+    "confidence": 0.0
+})
+
+NO_SIGNAL_RESULT: Mapping[str, Any] = MappingProxyType({
+    "relevant": False,
+    "relevance_score": 0.0,
+    "matching_topics": (),
+    "reasoning": "No topic keywords found; skipped Gemini analysis",
+    "confidence": 0.0
+})
+
+# Queries whose query text and summary together are shorter than this cannot be judged
+MIN_QUERY_CHARS = 40
+
+INSUFFICIENT_CONTENT_RESULT: Mapping[str, Any] = MappingProxyType({
+    "relevant": False,
+    "relevance_score": 0.0,
+    "matching_topics": (),
+    "reasoning": "Insufficient query content; skipped Gemini analysis",
+    "confidence": 1.0
+})
+
+# Structured-output schemas: Gemini returns JSON matching these, so no fence stripping is needed
+VERDICT_RESPONSE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "relevant": {"type": "boolean"},
+        "relevance_score": {"type": "number"},
+        "confidence": {"type": "number"},
+        "matching_topics": {"type": "array", "items": {"type": "string"}},
+        "reasoning": {"type": "string"},
+    },
+    "required": list(REQUIRED_FIELDS),
+}
+
+BATCH_RESPONSE_SCHEMA = {
+    "type": "array",
+    "items": {
+        "type": "object",
+        "properties": {
+            "query_index": {"type": "integer"},
+            **VERDICT_RESPONSE_SCHEMA["properties"],
+        },
+        "required": ["query_index", *REQUIRED_FIELDS],
+    },
+}
+
+# Generation settings pinned per model so they aren't rebuilt on every request
+FILTER_GENERATION_CONFIG = {"temperature": 0.0, "response_mime_type": "application/json"}
+
+_models: Dict[str, genai.GenerativeModel] = {}
+_models_lock = threading.Lock()
+
+# Per-model client-side request limits (GEMINI_RPM <= 0 disables them), created on first use
+_rate_limiters: Optional[RateLimiterRegistry] = None
+_rate_limiters_lock = threading.Lock()
+
+# One semaphore per event loop; asyncio primitives must not be shared across loops
+_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+
+
+def _get_model(model_name: str) -> genai.GenerativeModel:
+    """Return the shared GenerativeModel for ``model_name``, creating it on first use."""
+    model = _models.get(model_name)
+    if model is None:
+        with _models_lock:
+            model = _models.get(model_name)
+            if model is None:
+                model = genai.GenerativeModel(model_name, generation_config=FILTER_GENERATION_CONFIG)
+                _models[model_name] = model
+    return model
+
+
+# Static prompt pieces are assembled once; only the per-query fields are formatted per call
+TOPIC_LINES = tuple(f"- {name}: {description}" for name, description in zip(TOPIC_NAMES, TOPIC_DESCRIPTIONS))
+
+
+@functools.lru_cache(maxsize=None)
+def topics_text_for_mask(mask: int) -> str:
+    """Prompt topic block restricted to the topics set in ``mask``."""
+    return "\n".join(line for bit, line in enumerate(TOPIC_LINES) if mask & (1 << bit))
+
+
+FILTER_PROMPT_TEMPLATE = ("""
 You are an expert at analyzing media queries to determine their relevance to specific business and technology topics.
 
 ANALYZE THIS HARO QUERY:
@@ -80,112 +377,733 @@ RESPOND WITH JSON ONLY:
 {{
     "relevant": true/false,
     "relevance_score": 0.0-1.0,
+    "confidence": 0.0-1.0,
     "matching_topics": ["topic1", "topic2"],
-    "reasoning": "Brief explanation of why this query is/isn't relevant",
-    "confidence": 0.0-1.0
+    "reasoning": "Brief explanation of why this query is/isn't relevant"
 }}
 
-Guidelines:
-- Be strict about relevance; prefer precision over recall. If unsure, set relevant=false.
-- Do not infer relevance from generic business language. Require explicit topical signals (direct mentions) or two strong implicit signals.
-- Scoring: 0.85–1.0 = clearly relevant; 0.65–0.84 = borderline; <0.65 = not relevant.
-- Confidence must reflect evidence. Lower confidence when signals are weak, ambiguous, or generic.
-- Only include topics that genuinely match. If none match, use an empty array.
-"""
+""" + FILTER_GUIDELINES).strip()
+
+BATCH_FILTER_PROMPT_TEMPLATE = ("""
+You are an expert at analyzing media queries to determine their relevance to specific business and technology topics.
+
+ANALYZE EACH OF THESE {count} HARO QUERIES INDEPENDENTLY:
+
+{queries_text}
+
+RELEVANT TOPICS TO CONSIDER:
+{topics_text}
+
+TASK:
+For every query, determine if it is relevant to any of the above topics. Consider:
+1. Direct mentions of technologies, services, or concepts
+2. Implicit connections (e.g., "business growth" might relate to marketing)
+3. Industry context (startup, enterprise, small business needs)
+4. Professional expertise areas (development, marketing, strategy)
+
+RESPOND WITH A JSON ARRAY ONLY, one object per query, in query order:
+[
+    {{
+        "query_index": 1,
+        "relevant": true/false,
+        "relevance_score": 0.0-1.0,
+        "confidence": 0.0-1.0,
+        "matching_topics": ["topic1", "topic2"],
+        "reasoning": "Brief explanation of why this query is/isn't relevant"
+    }}
+]
+
+""" + FILTER_GUIDELINES).strip()
+
+def create_gemini_filter_prompt(
+    query_text: str, summary: str = "", category: str = "", topic_mask: int = ALL_TOPICS_MASK
+) -> str:
+    """Create a prompt for Gemini to analyze HARO query relevance against the topics in ``topic_mask``."""
+    return FILTER_PROMPT_TEMPLATE.format(
+        summary=summary,
+        category=category,
+        query_text=query_text,
+        topics_text=topics_text_for_mask(topic_mask),
+    )
+
+def create_gemini_batch_filter_prompt(
+    batch: List[Tuple[str, str, str]], topic_mask: int = ALL_TOPICS_MASK
+) -> str:
+    """Create one prompt asking Gemini to analyze several HARO queries at once."""
+    queries_text = "\n\n".join(
+        f"### QUERY {i}\nSummary: {summary}\nCategory: {category}\nQuery Text: {query_text}"
+        for i, (query_text, summary, category) in enumerate(batch, start=1)
+    )
+    return BATCH_FILTER_PROMPT_TEMPLATE.format(
+        count=len(batch), queries_text=queries_text, topics_text=topics_text_for_mask(topic_mask)
+    )
+
+_verdict_cache: Optional[VerdictCache] = None
+_verdict_cache_lock = threading.Lock()
+_verdict_cache_failed = False
+
+
+def get_verdict_cache() -> Optional[VerdictCache]:
+    """Return the shared verdict cache, or None when caching is disabled/unavailable."""
+    global _verdict_cache, _verdict_cache_failed
+    cfg = get_config()
+    if not cfg.use_cache or _verdict_cache_failed:
+        return None
+    if _verdict_cache is None:
+        with _verdict_cache_lock:
+            if _verdict_cache is None and not _verdict_cache_failed:
+                try:
+                    _verdict_cache = VerdictCache(
+                        cfg.cache_path, cfg.semantic_cache_threshold, ttl_days=cfg.cache_ttl_days
+                    )
+                except Exception as e:
+                    logger.error("Failed to open Gemini verdict cache at %s: %s", cfg.cache_path, e)
+                    _verdict_cache_failed = True
+    return _verdict_cache
+
+
+def embed_queries_for_cache(batch: List[Tuple[str, str, str]]) -> List[Optional[List[float]]]:
+    """Embed several queries in one call for semantic cache lookups; None entries on failure."""
+    if not batch:
+        return []
+    try:
+        result = genai.embed_content(
+            model=get_config().embedding_model,
+            content=[f"{summary}\n{category}\n{query_text}" for query_text, summary, category in batch],
+            task_type="semantic_similarity",
+        )
+        return [list(vector) for vector in result["embedding"]]
+    except Exception as e:
+        logger.warning("Embedding for semantic cache failed: %s", e)
+        return [None] * len(batch)
+
+
+def embed_query_for_cache(query_text: str, summary: str = "", category: str = "") -> Optional[List[float]]:
+    """Embed a single query for semantic cache lookups; returns None on any failure."""
+    return embed_queries_for_cache([(query_text, summary, category)])[0]
+
+
+def _lookup_cached_verdict(
+    cache: Optional[VerdictCache], key: str, query_text: str, summary: str, category: str
+) -> Tuple[Optional[Mapping[str, Any]], Optional[List[float]]]:
+    """Return (cached_verdict, embedding) for a query; the embedding is reused when storing a miss."""
+    if not cache:
+        return None, None
+    cached = cache.get(key)
+    if cached is not None:
+        logger.info("Gemini verdict cache hit: %.100s...", summary)
+        return _freeze_analysis(cached), None
+    if not cache.semantic_enabled:
+        return None, None
+    vector = embed_query_for_cache(query_text, summary, category)
+    similar = cache.get_similar(vector) if vector else None
+    if similar is not None:
+        cache.put(key, similar)
+        return _freeze_analysis(similar), vector
+    return None, vector
+
+
+def _parse_single_response(model_name: str, response_text: str) -> Optional[Dict]:
+    """Decode a single-query verdict and check it carries every schema field."""
+    try:
+        result = orjson.loads(response_text)
+    except orjson.JSONDecodeError as e:
+        logger.error("Failed to parse Gemini JSON response from %s: %s", model_name, e)
+        logger.error("Raw response: %s", response_text)
+        return None
+    
+    if not isinstance(result, dict) or not _REQUIRED_FIELD_SET.issubset(result):
+        logger.error("Gemini response from %s is missing verdict fields", model_name)
+        logger.error("Raw response: %s", response_text)
+        return None
+    
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(
+            "Gemini analysis (%s): Relevant=%s, Score=%.2f, Topics=%s",
+            model_name, result["relevant"], result["relevance_score"], result["matching_topics"],
+        )
+    return result
+
+
+class _JsonCompletionTracker:
+    """Incrementally scans streamed text and reports when the top-level JSON value is closed."""
     
-    return prompt.strip()
+    __slots__ = ("depth", "in_string", "escaped", "started")
+    
+    def __init__(self):
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+        self.started = False
+    
+    def feed(self, text: str) -> bool:
+        for ch in text:
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif ch == "\\":
+                    self.escaped = True
+                elif ch == '"':
+                    self.in_string = False
+            elif ch == '"':
+                self.in_string = True
+            elif ch in "{[":
+                self.depth += 1
+                self.started = True
+            elif ch in "}]":
+                self.depth -= 1
+                if self.started and self.depth == 0:
+                    return True
+        return False
+
+
+def _close_stream(response: Any) -> None:
+    # Best effort: cancel the underlying server stream so no further tokens are generated
+    cancel = getattr(getattr(response, "_iterator", None), "cancel", None)
+    if callable(cancel):
+        try:
+            cancel()
+        except Exception:
+            pass
+
+
+def _collect_json_stream(response: Any) -> str:
+    """Join streamed chunks, stopping as soon as the JSON value is complete."""
+    tracker = _JsonCompletionTracker()
+    parts: List[str] = []
+    for chunk in response:
+        text = chunk.text
+        parts.append(text)
+        if tracker.feed(text):
+            _close_stream(response)
+            break
+    return "".join(parts)
+
+
+async def _collect_json_stream_async(response: Any) -> str:
+    """Async variant of _collect_json_stream."""
+    tracker = _JsonCompletionTracker()
+    parts: List[str] = []
+    async for chunk in response:
+        text = chunk.text
+        parts.append(text)
+        if tracker.feed(text):
+            _close_stream(response)
+            break
+    return "".join(parts)
+
+
+def _is_quota_error(error: Exception) -> bool:
+    error_msg = str(error)
+    return "quota" in error_msg.lower() or "429" in error_msg
+
+
+def _get_rate_limiters() -> RateLimiterRegistry:
+    global _rate_limiters
+    if _rate_limiters is None:
+        # Concurrent chunk workers must share one registry, or their window accounting splits
+        with _rate_limiters_lock:
+            if _rate_limiters is None:
+                _rate_limiters = RateLimiterRegistry(get_config().rpm)
+    return _rate_limiters
 
-def analyze_query_with_gemini(query_text: str, summary: str = "", category: str = "") -> Dict:
-    """Use Gemini to analyze HARO query relevance with automatic fallback."""
+
+def _wait_for_slot(model_name: str) -> None:
+    """Block until ``model_name`` has request capacity instead of sending into a 429.
+
+    Sleeps the calling thread: the sync filter API must run in worker threads, never on
+    an event loop (main.py calls it via asyncio.to_thread); async callers use _wait_for_slot_async.
+    """
+    delay = _get_rate_limiters().reserve(model_name)
+    if delay > 0:
+        logger.info("Waiting %.1fs for a %s request slot", delay, model_name)
+        time.sleep(delay)
+
+
+async def _wait_for_slot_async(model_name: str) -> None:
+    """Async variant of _wait_for_slot."""
+    delay = _get_rate_limiters().reserve(model_name)
+    if delay > 0:
+        logger.info("Waiting %.1fs for a %s request slot", delay, model_name)
+        await asyncio.sleep(delay)
+
+
+def analyze_query_with_gemini(
+    query_text: str, summary: str = "", category: str = "", topic_mask: Optional[int] = None
+) -> Mapping[str, Any]:
+    """Use Gemini to analyze HARO query relevance with automatic fallback.
     
-    if not USE_GEMINI_FILTERING or not GEMINI_API_KEY:
+    Every result, fresh, cached or fallback, is a read-only mapping.
+    ``topic_mask`` limits the topics listed in the prompt; by default it is derived from keyword matches.
+    """
+    
+    cfg = get_config()
+    if not cfg.use_filtering or not cfg.api_key:
         logger.warning("Gemini filtering disabled or API key missing")
-        return {
-            "relevant": False,
-            "relevance_score": 0.0,
-            "matching_topics": [],
-            "reasoning": "Gemini filtering disabled",
-            "confidence": 0.0
-        }
+        return DISABLED_RESULT
     
-    # Try primary model first, then fallback to secondary model
-    models_to_try = [GEMINI_FILTER_MODEL, "gemini-1.5-flash"]
+    # Serve repeats and near-duplicates from the verdict cache before paying for an RPC
+    cache = get_verdict_cache()
+    key = cache_key(query_text, summary, category)
+    cached, vector = _lookup_cached_verdict(cache, key, query_text, summary, category)
+    if cached is not None:
+        return cached
+    
+    if topic_mask is None:
+        topic_mask = _prompt_topic_mask(query_text, summary, category)
+    prompt = create_gemini_filter_prompt(query_text, summary, category, topic_mask)
+    result = _analyze_prompt(prompt, summary)
+    if result is None:
+        # If all models failed
+        logger.error("All Gemini models failed, using fallback result")
+        return create_fallback_result()
+    
+    if cache:
+        cache.put(key, result, vector)
+    return _freeze_analysis(result)
+
+def _analyze_prompt(prompt: str, summary: str) -> Optional[Dict]:
+    """Send a single-query prompt to each filter model in turn; None when every model fails."""
+    
+    cfg = get_config()
     
-    for model_name in models_to_try:
+    # Try primary model first, then fallback to secondary model
+    for model_name in cfg.filter_models:
         try:
-            # Configure Gemini
-            genai.configure(api_key=GEMINI_API_KEY)
-            model = genai.GenerativeModel(model_name)
-            
-            # Create prompt
-            prompt = create_gemini_filter_prompt(query_text, summary, category)
-            
-            logger.info(f"Analyzing query with Gemini ({model_name}): {summary[:100]}...")
+            model = _get_model(model_name)
             
-            # Generate response
-            response = model.generate_content(prompt)
-            response_text = response.text.strip()
+            logger.info("Analyzing query with Gemini (%s): %.100s...", model_name, summary)
             
-            # Parse JSON response
-            try:
-                # Clean up response text (remove markdown formatting if present)
-                if response_text.startswith("```json"):
-                    response_text = response_text.replace("```json", "").replace("```", "").strip()
-                elif response_text.startswith("```"):
-                    response_text = response_text.replace("```", "").strip()
-                
-                result = json.loads(response_text)
-                
-                # Validate response structure
-                required_fields = ["relevant", "relevance_score", "matching_topics", "reasoning", "confidence"]
-                if not all(field in result for field in required_fields):
-                    logger.error(f"Invalid Gemini response structure from {model_name}")
-                    continue  # Try next model
-                
-                logger.info(f"Gemini analysis ({model_name}): Relevant={result['relevant']}, Score={result['relevance_score']:.2f}, Topics={result['matching_topics']}")
-                return result
-                
-            except json.JSONDecodeError as e:
-                logger.error(f"Failed to parse Gemini JSON response from {model_name}: {e}")
-                logger.error(f"Raw response: {response_text}")
+            _wait_for_slot(model_name)
+            response = model.generate_content(
+                prompt, generation_config={"response_schema": VERDICT_RESPONSE_SCHEMA}, stream=True
+            )
+            response_text = _collect_json_stream(response)
+            _get_rate_limiters().record(model_name, rate_limited=False)
+            result = _parse_single_response(model_name, response_text)
+            if result is None:
                 continue  # Try next model
+            return result
                 
         except Exception as e:
-            error_msg = str(e)
-            if "quota" in error_msg.lower() or "429" in error_msg:
-                logger.warning(f"Quota exceeded for {model_name}, trying fallback model...")
-                continue  # Try next model
+            if _is_quota_error(e):
+                _get_rate_limiters().record(model_name, rate_limited=True)
+                logger.warning("Quota exceeded for %s, trying fallback model...", model_name)
             else:
-                logger.exception(f"Error in Gemini query analysis with {model_name}: {e}")
-                continue  # Try next model
+                logger.exception("Error in Gemini query analysis with %s: %s", model_name, e)
+            continue  # Try next model
+    
+    return None
+
+def _get_semaphore() -> asyncio.Semaphore:
+    """Return the concurrency limiter for the running event loop."""
+    loop = asyncio.get_running_loop()
+    semaphore = _semaphores.get(loop)
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(get_config().max_concurrency)
+        _semaphores[loop] = semaphore
+    return semaphore
+
+async def _analyze_with_model_async(model_name: str, prompt: str, summary: str) -> Optional[Dict]:
+    """Run the prompt on one model (retrying rate limits); None when the model fails."""
+    try:
+        model = _get_model(model_name)
+        
+        logger.info("Analyzing query with Gemini async (%s): %.100s...", model_name, summary)
+        
+        # Back off and retry on rate limits before falling through to the next model
+        async for attempt in AsyncRetrying(
+            reraise=True,
+            stop=stop_after_attempt(3),
+            wait=wait_exponential_jitter(initial=1, max=30),
+            retry=retry_if_exception_message(match=r"(?is).*(429|quota)"),
+        ):
+            with attempt:
+                await _wait_for_slot_async(model_name)
+                try:
+                    response = await model.generate_content_async(
+                        prompt, generation_config={"response_schema": VERDICT_RESPONSE_SCHEMA}, stream=True
+                    )
+                    response_text = await _collect_json_stream_async(response)
+                except Exception as e:
+                    if _is_quota_error(e):
+                        _get_rate_limiters().record(model_name, rate_limited=True)
+                    raise
+                _get_rate_limiters().record(model_name, rate_limited=False)
+        
+        return _parse_single_response(model_name, response_text)
+        
+    except Exception as e:
+        if _is_quota_error(e):
+            logger.warning("Quota exceeded for %s, trying fallback model...", model_name)
+        else:
+            logger.exception("Error in async Gemini query analysis with %s: %s", model_name, e)
+        return None
+
+async def _analyze_hedged_async(
+    model_names: Tuple[str, ...], prompt: str, summary: str, hedge_delay: float
+) -> Optional[Dict]:
+    """Start each fallback model ``hedge_delay`` seconds after the previous one; first verdict wins."""
+    pending = set()
+    try:
+        for model_name in model_names:
+            pending.add(asyncio.create_task(_analyze_with_model_async(model_name, prompt, summary)))
+            # Give the models already running a head start; stop waiting early if one finishes
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, timeout=hedge_delay, return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    break  # still slow: hedge with the next model
+                for task in done:
+                    result = task.result()
+                    if result is not None:
+                        return result
+                if not pending:
+                    break  # everything so far failed: move straight to the next model
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                result = task.result()
+                if result is not None:
+                    return result
+        return None
+    finally:
+        for task in pending:
+            task.cancel()
+
+async def _analyze_models_async(cfg: FilterConfig, prompt: str, summary: str) -> Optional[Dict]:
+    """Try the configured models in order (or hedged); None when every model failed."""
+    if cfg.hedge_ms > 0 and len(cfg.filter_models) > 1:
+        return await _analyze_hedged_async(cfg.filter_models, prompt, summary, cfg.hedge_ms / 1000)
+    for model_name in cfg.filter_models:
+        result = await _analyze_with_model_async(model_name, prompt, summary)
+        if result is not None:
+            return result
+    return None
+
+async def analyze_query_with_gemini_async(
+    query_text: str, summary: str = "", category: str = "", topic_mask: Optional[int] = None
+) -> Mapping[str, Any]:
+    """Async variant of analyze_query_with_gemini, bounded by GEMINI_MAX_CONCURRENCY."""
+    
+    cfg = get_config()
+    if not cfg.use_filtering or not cfg.api_key:
+        logger.warning("Gemini filtering disabled or API key missing")
+        return DISABLED_RESULT
+    
+    cache = get_verdict_cache()
+    key = cache_key(query_text, summary, category)
+    cached, vector = await asyncio.to_thread(
+        _lookup_cached_verdict, cache, key, query_text, summary, category
+    )
+    if cached is not None:
+        return cached
+    
+    if topic_mask is None:
+        topic_mask = _prompt_topic_mask(query_text, summary, category)
+    prompt = create_gemini_filter_prompt(query_text, summary, category, topic_mask)
+    
+    async with _get_semaphore():
+        # The timeout starts once a slot is held, so queueing behind other calls does not count
+        try:
+            result = await asyncio.wait_for(
+                _analyze_models_async(cfg, prompt, summary), timeout=cfg.timeout_seconds or None
+            )
+        except asyncio.TimeoutError:
+            logger.warning("Gemini query analysis timed out after %.1fs: %.100s...", cfg.timeout_seconds, summary)
+            result = None
+    
+    if result is not None:
+        if cache:
+            await asyncio.to_thread(cache.put, key, result, vector)
+        return _freeze_analysis(result)
     
-    # If all models failed
     logger.error("All Gemini models failed, using fallback result")
     return create_fallback_result()
 
-def create_fallback_result() -> Dict:
-    """Create a fallback result when Gemini analysis fails."""
-    return {
-        "relevant": False,
-        "relevance_score": 0.0,
-        "matching_topics": [],
-        "reasoning": "Analysis failed, defaulting to exclude",
-        "confidence": 0.0
-    }
+def _analyze_batch_chunk(
+    chunk: List[Tuple[str, str, str]], topic_mask: int = ALL_TOPICS_MASK
+) -> Optional[List[Optional[Dict]]]:
+    """Send one batched prompt and return verdicts aligned with ``chunk`` (None where missing).
+    
+    Returns None instead of a list when every model rejected the request as over quota.
+    """
+    
+    cfg = get_config()
+    prompt = create_gemini_batch_filter_prompt(chunk, topic_mask)
+    quota_exhausted = True
+    
+    for model_name in cfg.filter_models:
+        try:
+            model = _get_model(model_name)
+            
+            logger.info("Analyzing %d queries with one Gemini call (%s)", len(chunk), model_name)
+            
+            _wait_for_slot(model_name)
+            response = model.generate_content(
+                prompt,
+                generation_config={"response_schema": BATCH_RESPONSE_SCHEMA},
+                stream=True,
+            )
+            response_text = _collect_json_stream(response)
+            _get_rate_limiters().record(model_name, rate_limited=False)
+            quota_exhausted = False
+            
+            try:
+                parsed = orjson.loads(response_text)
+            except orjson.JSONDecodeError as e:
+                logger.error("Failed to parse batched Gemini JSON response from %s: %s", model_name, e)
+                continue  # Try next model
+            
+            if not isinstance(parsed, list):
+                logger.error("Batched Gemini response from %s is not a JSON array", model_name)
+                continue  # Try next model
+            
+            results: List[Optional[Dict]] = [None] * len(chunk)
+            for item in parsed:
+                if not isinstance(item, dict) or not _REQUIRED_FIELD_SET.issubset(item):
+                    continue
+                try:
+                    index = int(item.get("query_index", 0)) - 1
+                except (TypeError, ValueError):
+                    continue
+                if 0 <= index < len(chunk) and results[index] is None:
+                    results[index] = {field: item[field] for field in REQUIRED_FIELDS}
+            
+            resolved = sum(r is not None for r in results)
+            logger.info("Batched Gemini analysis (%s): %d/%d verdicts parsed", model_name, resolved, len(chunk))
+            return results
+            
+        except Exception as e:
+            if _is_quota_error(e):
+                _get_rate_limiters().record(model_name, rate_limited=True)
+                logger.warning("Quota exceeded for %s, trying fallback model...", model_name)
+            else:
+                quota_exhausted = False
+                logger.exception("Error in batched Gemini query analysis with %s: %s", model_name, e)
+            continue  # Try next model
+    
+    logger.error("All Gemini models failed for batched analysis")
+    return None if quota_exhausted else [None] * len(chunk)
 
-def should_include_query_gemini(query_text: str, summary: str = "", category: str = "") -> Tuple[bool, Dict]:
-    """Use Gemini to determine if a HARO query should be included."""
+def analyze_queries_with_gemini(
+    batch: List[Tuple[str, str, str]], topic_masks: Optional[List[int]] = None
+) -> List[Mapping[str, Any]]:
+    """Analyze many (query_text, summary, category) triples using batched Gemini prompts.
+    
+    Cached verdicts are reused; remaining queries are sent GEMINI_BATCH_SIZE at a time.
+    Queries the batched reply does not cover are retried with single-query prompts,
+    unless the batch was refused for quota (more calls would only queue behind it).
+    ``topic_masks`` (one per item) limits each chunk's prompt to the union of its topics.
+    Results are read-only mappings, returned in input order.
+    """
+    
+    cfg = get_config()
+    if not cfg.use_filtering or not cfg.api_key:
+        logger.warning("Gemini filtering disabled or API key missing")
+        return [DISABLED_RESULT] * len(batch)
+    
+    results: List[Optional[Mapping[str, Any]]] = [None] * len(batch)
+    keys = [cache_key(q, s, c) for q, s, c in batch]
+    vectors: List[Optional[List[float]]] = [None] * len(batch)
+    
+    cache = get_verdict_cache()
+    if cache:
+        for i, key in enumerate(keys):
+            cached = cache.get(key)
+            if cached is not None:
+                results[i] = _freeze_analysis(cached)
+    
+    # Identical queries in one batch (digests repeat requests) are analyzed once and copied
+    first_index: Dict[str, int] = {}
+    duplicates = [
+        (i, first_index[keys[i]])
+        for i, r in enumerate(results)
+        if r is None and first_index.setdefault(keys[i], i) != i
+    ]
+    duplicate_indices = {i for i, _ in duplicates}
+    
+    if cache:
+        if cache.semantic_enabled:
+            pending = [i for i, r in enumerate(results) if r is None and i not in duplicate_indices]
+            embedded = embed_queries_for_cache([batch[i] for i in pending])
+            misses = VectorIndex()
+            for i, vector in zip(pending, embedded):
+                vectors[i] = vector
+                if not vector:
+                    continue
+                similar = cache.get_similar(vector)
+                if similar is not None:
+                    cache.put(keys[i], similar)
+                    results[i] = _freeze_analysis(similar)
+                    continue
+                # Rephrasings of a query earlier in this batch share its verdict too
+                unit = normalize(vector)
+                if not unit:
+                    continue
+                score, first = misses.nearest(unit)
+                if first is not None and score >= cache.semantic_threshold:
+                    duplicates.append((i, first))
+                    duplicate_indices.add(i)
+                else:
+                    misses.add(i, unit)
     
-    analysis = analyze_query_with_gemini(query_text, summary, category)
+    pending = [i for i, r in enumerate(results) if r is None and i not in duplicate_indices]
+    served = len(batch) - len(pending) - len(duplicates)
+    if served:
+        logger.info("Gemini verdict cache served %d/%d queries", served, len(batch))
+    if duplicates:
+        logger.info("Analyzing %d repeated or rephrased queries once", len(duplicates))
     
-    # Decision logic
+    # Even-sized chunks (no small leftover request), sent concurrently so a whole digest
+    # costs about one round trip; the rate limiter still paces them per model
+    chunks: List[List[int]] = []
+    if pending:
+        chunk_count = -(-len(pending) // cfg.batch_size)
+        size = -(-len(pending) // chunk_count)
+        chunks = [pending[start:start + size] for start in range(0, len(pending), size)]
+    chunk_masks = []
+    for chunk_indices in chunks:
+        chunk_mask = 0
+        for i in chunk_indices:
+            chunk_mask |= topic_masks[i] if topic_masks else _prompt_topic_mask(*batch[i])
+        chunk_masks.append(chunk_mask)
+    if len(chunks) > 1:
+        with ThreadPoolExecutor(max_workers=min(len(chunks), cfg.max_concurrency)) as executor:
+            chunk_verdicts = list(executor.map(
+                lambda indices, mask: _analyze_batch_chunk([batch[i] for i in indices], mask),
+                chunks,
+                chunk_masks,
+            ))
+    else:
+        chunk_verdicts = [
+            _analyze_batch_chunk([batch[i] for i in indices], mask) for indices, mask in zip(chunks, chunk_masks)
+        ]
+    
+    for chunk_indices, verdicts in zip(chunks, chunk_verdicts):
+        if verdicts is None:
+            for i in chunk_indices:
+                results[i] = create_fallback_result()
+            continue
+        missing = sum(v is None for v in verdicts)
+        if missing:
+            logger.warning("Retrying %d/%d queries with single-query prompts", missing, len(chunk_indices))
+        for i, verdict in zip(chunk_indices, verdicts):
+            if verdict is None:
+                q, s, c = batch[i]
+                mask = topic_masks[i] if topic_masks else _prompt_topic_mask(q, s, c)
+                verdict = _analyze_prompt(create_gemini_filter_prompt(q, s, c, mask), s)
+            if verdict is None:
+                results[i] = create_fallback_result()
+                continue
+            results[i] = _freeze_analysis(verdict)
+            if cache:
+                cache.put(keys[i], verdict, vectors[i])
+    
+    source = dict(duplicates)
+    for i, first in duplicates:
+        # An exact repeat of a rephrasing points at another duplicate; copy from the analyzed query
+        while first in source:
+            first = source[first]
+        results[i] = results[first]
+        if cache and keys[i] != keys[first] and results[first] is not FALLBACK_RESULT:
+            cache.put(keys[i], results[first], vectors[i])
+    return [r if r is not None else create_fallback_result() for r in results]
+
+def create_fallback_result() -> Mapping[str, Any]:
+    """Return the shared (read-only) fallback result used when Gemini analysis fails."""
+    return FALLBACK_RESULT
+
+def create_no_signal_result() -> Mapping[str, Any]:
+    """Result for queries rejected by the keyword prefilter without calling Gemini."""
+    return NO_SIGNAL_RESULT
+
+def _is_too_short(query_text: str, summary: str) -> bool:
+    """True for empty or near-empty queries (e.g. malformed digest rows) not worth a Gemini call."""
+    return len(query_text.strip()) + len(summary.strip()) < MIN_QUERY_CHARS
+
+def _is_relevant(analysis: Mapping[str, Any]) -> bool:
+    """Apply the inclusion thresholds to a Gemini analysis dict."""
+    cfg = get_config()
     # Require at least one matching topic, higher relevance and confidence
-    is_relevant = (
+    return bool(
         analysis["relevant"]
-        and analysis["relevance_score"] >= GEMINI_FILTER_THRESHOLD
-        and analysis["confidence"] >= GEMINI_CONFIDENCE_THRESHOLD
-        and isinstance(analysis.get("matching_topics"), list)
-        and len(analysis.get("matching_topics")) > 0
+        and analysis["relevance_score"] >= cfg.filter_threshold
+        and analysis["confidence"] >= cfg.confidence_threshold
+        and analysis.get("matching_topics")
+    )
+
+def _freeze_analysis(analysis: Mapping[str, Any]) -> Mapping[str, Any]:
+    """Read-only copy of an analysis that is safe to share between callers."""
+    if isinstance(analysis, MappingProxyType):
+        return analysis
+    frozen = dict(analysis)
+    frozen["matching_topics"] = tuple(frozen.get("matching_topics") or ())
+    return MappingProxyType(frozen)
+
+def should_include_query_gemini(query_text: str, summary: str = "", category: str = "") -> Tuple[bool, Mapping[str, Any]]:
+    """Use Gemini to determine if a HARO query should be included.
+    
+    Repeats are answered by the verdict cache; the returned analysis is read-only.
+    """
+    
+    query_text, summary, category = query_text or "", summary or "", category or ""
+    if _is_too_short(query_text, summary):
+        return False, INSUFFICIENT_CONTENT_RESULT
+    mask = match_topic_mask(f"{summary} {category} {query_text}")
+    if not mask and get_config().keyword_prefilter:
+        return False, create_no_signal_result()
+    
+    analysis = analyze_query_with_gemini(query_text, summary, category, mask or ALL_TOPICS_MASK)
+    
+    return _is_relevant(analysis), analysis
+
+def should_include_queries_gemini(batch: List[Tuple[str, str, str]]) -> List[Tuple[bool, Mapping[str, Any]]]:
+    """Batched variant of should_include_query_gemini; results are in input order."""
+    
+    decisions: List[Tuple[bool, Mapping[str, Any]]] = [(False, create_no_signal_result()) for _ in batch]
+    # Degenerate rows are rejected before keyword matching; they can only come back "not enough info"
+    substantive = []
+    for i, (q, s, _) in enumerate(batch):
+        if _is_too_short(q or "", s or ""):
+            decisions[i] = (False, INSUFFICIENT_CONTENT_RESULT)
+        else:
+            substantive.append(i)
+    if len(substantive) < len(batch):
+        logger.info("Skipped Gemini for %d/%d queries with too little content", len(batch) - len(substantive), len(batch))
+    
+    masks = {i: match_topic_mask(f"{batch[i][1]} {batch[i][2]} {batch[i][0]}") for i in substantive}
+    candidates = [i for i in substantive if masks[i] or not get_config().keyword_prefilter]
+    if len(candidates) < len(substantive):
+        logger.info("Keyword prefilter skipped Gemini for %d/%d queries", len(substantive) - len(candidates), len(batch))
+    
+    analyses = analyze_queries_with_gemini(
+        [batch[i] for i in candidates], [masks[i] or ALL_TOPICS_MASK for i in candidates]
     )
+    for i, analysis in zip(candidates, analyses):
+        decisions[i] = (_is_relevant(analysis), analysis)
+    
+    return decisions
+
+async def should_include_query_gemini_async(query_text: str, summary: str = "", category: str = "") -> Tuple[bool, Mapping[str, Any]]:
+    """Async variant of should_include_query_gemini."""
+    
+    if _is_too_short(query_text or "", summary or ""):
+        return False, INSUFFICIENT_CONTENT_RESULT
+    mask = match_topic_mask(f"{summary} {category} {query_text}")
+    if not mask and get_config().keyword_prefilter:
+        return False, create_no_signal_result()
+    
+    analysis = await analyze_query_with_gemini_async(query_text, summary, category, mask or ALL_TOPICS_MASK)
     
-    return is_relevant, analysis
+    return _is_relevant(analysis), analysis
+
+async def should_include_queries_gemini_async(batch: List[Tuple[str, str, str]]) -> List[Tuple[bool, Mapping[str, Any]]]:
+    """Analyze queries concurrently (bounded by GEMINI_MAX_CONCURRENCY); results are in input order."""
+    
+    return list(
+        await asyncio.gather(
+            *(should_include_query_gemini_async(q, s, c) for q, s, c in batch)
+        )
+    )
@@ -0,0 +1,89 @@
+"""
+Client-side request rate limiting for Gemini models.
+Requests wait for a free slot instead of being sent into a 429; each model has its
+own window so the fallback model's quota is not spent by the primary's overflow.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict
+
+logger = logging.getLogger("gemini_rate_limit")
+
+
+class ModelRateLimiter:
+    """Moving-window requests-per-minute limiter with multiplicative decrease on 429s."""
+
+    def __init__(self, requests_per_minute: int, window_seconds: float = 60.0):
+        self.max_limit = max(1, requests_per_minute)
+        self.limit = self.max_limit
+        self.window_seconds = window_seconds
+        self._hits: Deque[float] = deque()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Claim the next free slot and return how many seconds to wait before using it."""
+        with self._lock:
+            now = time.monotonic()
+            while self._hits and self._hits[0] <= now - self.window_seconds:
+                self._hits.popleft()
+            if len(self._hits) < self.limit:
+                slot = now
+            else:
+                # The slot frees up one window after the request `limit` places back
+                slot = self._hits[-self.limit] + self.window_seconds
+            self._hits.append(max(slot, now))
+            return max(0.0, slot - now)
+
+    def on_rate_limited(self) -> None:
+        """Halve the allowed rate after the server rejected a request as over quota."""
+        with self._lock:
+            self.limit = max(1, self.limit // 2)
+        logger.warning("Rate limited by Gemini; lowering client limit to %d requests/minute", self.limit)
+
+    def on_success(self) -> None:
+        """Grow the allowed rate back towards the configured limit, one request at a time."""
+        if self.limit < self.max_limit:
+            with self._lock:
+                self.limit = min(self.max_limit, self.limit + 1)
+
+
+class RateLimiterRegistry:
+    """Lazily created limiter per model name."""
+
+    def __init__(self, requests_per_minute: int):
+        self.requests_per_minute = requests_per_minute
+        self._limiters: Dict[str, ModelRateLimiter] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.requests_per_minute > 0
+
+    def get(self, model_name: str) -> ModelRateLimiter:
+        limiter = self._limiters.get(model_name)
+        if limiter is None:
+            with self._lock:
+                limiter = self._limiters.get(model_name)
+                if limiter is None:
+                    limiter = ModelRateLimiter(self.requests_per_minute)
+                    self._limiters[model_name] = limiter
+        return limiter
+
+    def reserve(self, model_name: str) -> float:
+        """Seconds to wait before sending a request to ``model_name`` (0 when disabled)."""
+        if not self.enabled:
+            return 0.0
+        return self.get(model_name).reserve()
+
+    def record(self, model_name: str, rate_limited: bool) -> None:
+        """Feed a request outcome back into the model's limiter."""
+        if not self.enabled:
+            return
+        limiter = self.get(model_name)
+        if rate_limited:
+            limiter.on_rate_limited()
+        else:
+            limiter.on_success()
@@ -22,11 +22,11 @@ import base64
 import datetime as dt
 import email
 import email.policy
-import json
+import functools
 import html as html_lib
-import random
 import logging
 import os
+import queue
 import re
 import re
 from email.utils import parseaddr
@@ -35,13 +35,22 @@ import sqlite3
 import sys
 import textwrap
 import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
 from dataclasses import dataclass
 from email.message import EmailMessage
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 
+import orjson
 from dotenv import load_dotenv
-from gemini_filter import should_include_query_gemini, USE_GEMINI_FILTERING
-from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
+from gemini_filter import (
+    should_include_queries_gemini,
+    start_warmup as start_gemini_filter_warmup,
+    USE_GEMINI_FILTERING,
+)
+from telegram_rate_limit import TelegramRateLimiter
+from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception, retry_if_exception_type
 
 # Gmail API
 from google.oauth2.credentials import Credentials
@@ -52,6 +61,7 @@ from googleapiclient.errors import HttpError
 
 # Google Gemini
 import google.generativeai as genai
+from google.api_core import exceptions as google_exceptions
 
 # Telegram bot (async, v21+)
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup, Update
@@ -65,8 +75,41 @@ from telegram.ext import (
     filters,
 )
 
-# HTML parsing
-from bs4 import BeautifulSoup
+# google-re2 gives linear-time matching for the scans over long digest bodies (optional)
+try:
+    import re2 as fast_re
+except ImportError:  # pragma: no cover
+    fast_re = re
+
+# HARO include/exclude keywords are matched in one pass with an Aho-Corasick automaton (optional)
+try:
+    import ahocorasick  # pyahocorasick
+except ImportError:  # pragma: no cover
+    ahocorasick = None
+
+# Gmail push notifications arrive through a Cloud Pub/Sub pull subscription (optional)
+try:
+    from google.cloud import pubsub_v1
+except ImportError:  # pragma: no cover
+    pubsub_v1 = None
+
+# HTML parsing: selectolax (Lexbor) for text extraction, BeautifulSoup as the fallback
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:  # pragma: no cover
+    LexborHTMLParser = None
+
+try:
+    import lxml  # noqa: F401
+    BS4_PARSER = "lxml"
+except ImportError:  # pragma: no cover
+    BS4_PARSER = "html.parser"
+
+# Only body text is kept, so <head> is never built into the tree. lxml supplies an implied
+# <body> for bare fragments; html.parser does not, so it has to parse the whole document.
+_BODY_STRAINER = SoupStrainer("body") if BS4_PARSER == "lxml" else None
 
 
 # ------------------------------
@@ -87,19 +130,33 @@ GMAIL_TOKEN_FILE = os.getenv("GMAIL_TOKEN_FILE", "token.json")
 
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "")
 GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-2.5-flash")
+# Static draft prompt instructions are stored once as Gemini cached content
+USE_GEMINI_DRAFT_CACHE = os.getenv("USE_GEMINI_DRAFT_CACHE", "true").lower() == "true"
+GEMINI_DRAFT_CACHE_TTL_SECONDS = int(os.getenv("GEMINI_DRAFT_CACHE_TTL_SECONDS", "3600"))
 
 # Draft generation provider configuration
 DRAFT_LLM_PROVIDER = os.getenv("DRAFT_LLM_PROVIDER", "gemini").lower()
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
 GPT5_MODEL = os.getenv("GPT5_MODEL", "gpt-5-mini")
+# Drafts generated at the same time while processing a poll cycle
+DRAFT_CONCURRENCY = max(1, int(os.getenv("DRAFT_CONCURRENCY", "5")))
 
 TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN", "")
 TELEGRAM_CHAT_ID = int(os.getenv("TELEGRAM_CHAT_ID", "0") or "0")
+TELEGRAM_SEND_RETRIES = int(os.getenv("TELEGRAM_SEND_RETRIES", "3"))
 
 DB_PATH = os.getenv("DB_PATH", "data/app.db")
 LOG_DIR = os.getenv("LOG_DIR", "logs")
 POLL_INTERVAL_SECONDS = int(os.getenv("POLL_INTERVAL_SECONDS", "120"))
+
+# Gmail push notifications (users.watch -> Pub/Sub); plain polling is used when these are unset
+GMAIL_PUBSUB_TOPIC = os.getenv("GMAIL_PUBSUB_TOPIC", "")
+GMAIL_PUBSUB_SUBSCRIPTION = os.getenv("GMAIL_PUBSUB_SUBSCRIPTION", "")
+PUSH_FALLBACK_POLL_SECONDS = int(os.getenv("PUSH_FALLBACK_POLL_SECONDS", "3600"))
+GMAIL_WATCH_RENEW_SECONDS = 6 * 24 * 3600  # watches expire after 7 days
 MAX_TELEGRAM_MESSAGE_CHARS = 3800
+TELEGRAM_TRUNCATION_SUFFIX = "\n\n…[truncated]"
+MAX_REVIEW_TOPICS = 8
 
 # HARO filtering configuration
 HARO_INCLUDE_KEYWORDS = {
@@ -113,6 +170,20 @@ HARO_EXCLUDE_KEYWORDS = {
     if kw.strip()
 }
 
+
+def _build_keyword_automaton(keywords: set) -> Any:
+    if ahocorasick is None or not keywords:
+        return None
+    automaton = ahocorasick.Automaton()
+    for kw in keywords:
+        automaton.add_word(kw, kw)
+    automaton.make_automaton()
+    return automaton
+
+
+HARO_INCLUDE_AUTOMATON = _build_keyword_automaton(HARO_INCLUDE_KEYWORDS)
+HARO_EXCLUDE_AUTOMATON = _build_keyword_automaton(HARO_EXCLUDE_KEYWORDS)
+
 os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
 os.makedirs(LOG_DIR, exist_ok=True)
 os.makedirs("templates", exist_ok=True)
@@ -156,142 +227,324 @@ logger = logging.getLogger("main")
 # Database Layer
 # ------------------------------
 
-_db_lock = threading.Lock()
-
-
-def get_db_connection() -> sqlite3.Connection:
-    conn = sqlite3.connect(DB_PATH, check_same_thread=False)
+# All writes run on one writer thread that owns the read-write connection; callers queue
+# a function and wait for its result. A small pool of read-only connections serves queries,
+# and WAL lets them run while a write is in progress.
+DB_READER_POOL_SIZE = 4
+DB_WRITE_BATCH_MAX = 64
+DB_WRITE_TIMEOUT_SECONDS = 60.0
+_reader_pool: "queue.Queue[sqlite3.Connection]" = queue.Queue(maxsize=DB_READER_POOL_SIZE)
+# None is the shutdown sentinel (see close_db)
+_write_queue: "queue.Queue[Optional[Tuple[Callable[[sqlite3.Connection], Any], Future]]]" = queue.Queue()
+_writer_thread: Optional[threading.Thread] = None
+_writer_start_lock = threading.Lock()
+
+
+def _open_db_connection(read_only: bool = False) -> sqlite3.Connection:
+    if read_only:
+        conn = sqlite3.connect(f"file:{DB_PATH}?mode=ro", uri=True, check_same_thread=False, timeout=5.0)
+    else:
+        conn = sqlite3.connect(DB_PATH, check_same_thread=False, timeout=5.0)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
     conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA busy_timeout=5000")
+    conn.execute("PRAGMA temp_store=MEMORY")
     return conn
 
 
-def init_db() -> None:
-    with _db_lock:
-        conn = get_db_connection()
+def _run_write_batch(conn: sqlite3.Connection, jobs: List[Tuple[Callable[[sqlite3.Connection], Any], Future]]) -> None:
+    # Everything queued so far shares one transaction (and one fsync); each job gets a
+    # savepoint so a failing job is rolled back without discarding the others
+    done: List[Tuple[Future, Any]] = []
+    conn.execute("BEGIN")
+    for fn, future in jobs:
+        if not future.set_running_or_notify_cancel():
+            continue
+        conn.execute("SAVEPOINT write_job")
         try:
-            cur = conn.cursor()
-            cur.execute(
-                """
-                CREATE TABLE IF NOT EXISTS requests (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    gmail_message_id TEXT UNIQUE,
-                    gmail_thread_id TEXT,
-                    subject TEXT,
-                    sender TEXT,
-                    sender_email TEXT,
-                    reply_to TEXT,
-                    received_at TEXT,
-                    deadline TEXT,
-                    requirements TEXT,
-                    query_text TEXT,
-                    status TEXT,
-                    original_headers TEXT,
-                    created_at TEXT,
-                    updated_at TEXT
-                )
-                """
+            result = fn(conn)
+        except BaseException as e:
+            conn.execute("ROLLBACK TO write_job")
+            conn.execute("RELEASE write_job")
+            future.set_exception(e)
+        else:
+            conn.execute("RELEASE write_job")
+            done.append((future, result))
+    try:
+        conn.execute("COMMIT")
+    except Exception as e:
+        logger.exception("Database write batch failed to commit: %s", e)
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        for future, _ in done:
+            future.set_exception(e)
+    else:
+        for future, result in done:
+            future.set_result(result)
+
+
+def _db_writer_loop() -> None:
+    conn: Optional[sqlite3.Connection] = None
+    stopping = False
+    while not stopping:
+        job = _write_queue.get()
+        if job is None:
+            break
+        jobs = [job]
+        while len(jobs) < DB_WRITE_BATCH_MAX:
+            try:
+                job = _write_queue.get_nowait()
+            except queue.Empty:
+                break
+            if job is None:
+                stopping = True
+                break
+            jobs.append(job)
+        try:
+            if conn is None:
+                conn = _open_db_connection()
+                # Transactions are managed explicitly in _run_write_batch
+                conn.isolation_level = None
+            _run_write_batch(conn, jobs)
+        except Exception as e:
+            # Disk full, I/O errors, an unwritable file...: fail this batch instead of the thread,
+            # and reopen the connection for the next one so later writes can still succeed
+            logger.exception("Database writer failed; failing %d queued writes: %s", len(jobs), e)
+            for _, future in jobs:
+                if not future.done():
+                    future.set_exception(e)
+            if conn is not None:
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+                conn = None
+    # Closing the last connection checkpoints the WAL back into the database file
+    if conn is not None:
+        conn.close()
+
+
+def _ensure_db_writer() -> None:
+    global _writer_thread
+    if _writer_thread is None or not _writer_thread.is_alive():
+        with _writer_start_lock:
+            if _writer_thread is None or not _writer_thread.is_alive():
+                _writer_thread = threading.Thread(target=_db_writer_loop, name="db-writer", daemon=True)
+                _writer_thread.start()
+
+
+def close_db() -> None:
+    """Finish queued writes, stop the writer thread and close pooled connections."""
+    global _writer_thread
+    with _writer_start_lock:
+        writer, _writer_thread = _writer_thread, None
+        if writer is not None:
+            _write_queue.put(None)
+            writer.join()
+    while True:
+        try:
+            _reader_pool.get_nowait().close()
+        except queue.Empty:
+            break
+
+
+def db_write(fn: Callable[[sqlite3.Connection], Any]) -> Any:
+    """Run ``fn(conn)`` on the writer thread inside a transaction and return its result.
+
+    ``fn`` must not commit, and must not call db_write itself.
+    """
+    _ensure_db_writer()
+    future: Future = Future()
+    _write_queue.put((fn, future))
+    # Bounded so a wedged writer surfaces as an error instead of hanging every caller
+    return future.result(timeout=DB_WRITE_TIMEOUT_SECONDS)
+
+
+@contextmanager
+def _db_reader() -> Iterator[sqlite3.Connection]:
+    """Check a read connection out of the pool (opening one if the pool is empty)."""
+    try:
+        conn = _reader_pool.get_nowait()
+    except queue.Empty:
+        conn = _open_db_connection(read_only=True)
+    try:
+        yield conn
+    finally:
+        try:
+            _reader_pool.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+
+def init_db() -> None:
+    def _create_tables(conn: sqlite3.Connection) -> None:
+        cur = conn.cursor()
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS requests (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                gmail_message_id TEXT UNIQUE,
+                gmail_thread_id TEXT,
+                subject TEXT,
+                sender TEXT,
+                sender_email TEXT,
+                reply_to TEXT,
+                received_at TEXT,
+                deadline TEXT,
+                requirements TEXT,
+                query_text TEXT,
+                status TEXT,
+                original_headers TEXT,
+                created_at TEXT,
+                updated_at TEXT
             )
-            cur.execute(
-                """
-                CREATE TABLE IF NOT EXISTS drafts (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    request_id INTEGER,
-                    subject TEXT,
-                    body TEXT,
-                    model TEXT,
-                    approved INTEGER DEFAULT 0,
-                    created_at TEXT,
-                    updated_at TEXT,
-                    FOREIGN KEY (request_id) REFERENCES requests(id)
-                )
-                """
+            """
+        )
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS drafts (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                request_id INTEGER,
+                subject TEXT,
+                body TEXT,
+                model TEXT,
+                approved INTEGER DEFAULT 0,
+                created_at TEXT,
+                updated_at TEXT,
+                FOREIGN KEY (request_id) REFERENCES requests(id)
             )
-            cur.execute(
-                """
-                CREATE TABLE IF NOT EXISTS telegram_messages (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    request_id INTEGER,
-                    chat_id TEXT,
-                    message_id INTEGER,
-                    created_at TEXT,
-                    FOREIGN KEY (request_id) REFERENCES requests(id)
-                )
-                """
+            """
+        )
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS telegram_messages (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                request_id INTEGER,
+                chat_id TEXT,
+                message_id INTEGER,
+                created_at TEXT,
+                FOREIGN KEY (request_id) REFERENCES requests(id)
             )
-            cur.execute(
-                """
-                CREATE TABLE IF NOT EXISTS actions_log (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    request_id INTEGER,
-                    action TEXT,
-                    details TEXT,
-                    created_at TEXT,
-                    FOREIGN KEY (request_id) REFERENCES requests(id)
-                )
-                """
+            """
+        )
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS actions_log (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                request_id INTEGER,
+                action TEXT,
+                details TEXT,
+                created_at TEXT,
+                FOREIGN KEY (request_id) REFERENCES requests(id)
             )
-            cur.execute(
-                """
-                CREATE TABLE IF NOT EXISTS pending_edits (
-                    chat_id TEXT,
-                    request_id INTEGER,
-                    PRIMARY KEY (chat_id, request_id)
-                )
-                """
+            """
+        )
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS pending_edits (
+                chat_id TEXT,
+                request_id INTEGER,
+                PRIMARY KEY (chat_id, request_id)
             )
-            conn.commit()
-        finally:
-            conn.close()
+            """
+        )
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS state (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            )
+            """
+        )
+
+    db_write(_create_tables)
 
 
 def db_execute(query: str, params: Tuple[Any, ...] = ()) -> None:
-    with _db_lock:
-        conn = get_db_connection()
-        try:
-            cur = conn.cursor()
-            cur.execute(query, params)
-            conn.commit()
-        finally:
-            conn.close()
+    db_write(lambda conn: conn.execute(query, params))
 
 
 def db_query_one(query: str, params: Tuple[Any, ...] = ()) -> Optional[sqlite3.Row]:
-    with _db_lock:
-        conn = get_db_connection()
-        try:
-            cur = conn.cursor()
-            cur.execute(query, params)
-            row = cur.fetchone()
-            return row
-        finally:
-            conn.close()
+    with _db_reader() as conn:
+        cur = conn.cursor()
+        cur.execute(query, params)
+        row = cur.fetchone()
+        return row
 
 
 def db_query_all(query: str, params: Tuple[Any, ...] = ()) -> List[sqlite3.Row]:
-    with _db_lock:
-        conn = get_db_connection()
-        try:
-            cur = conn.cursor()
-            cur.execute(query, params)
-            rows = cur.fetchall()
-            return rows
-        finally:
-            conn.close()
+    with _db_reader() as conn:
+        cur = conn.cursor()
+        cur.execute(query, params)
+        rows = cur.fetchall()
+        return rows
 
 
-def log_action(request_id: int, action: str, details: str = "") -> None:
-    db_execute(
+def get_state(key: str) -> Optional[str]:
+    row = db_query_one("SELECT value FROM state WHERE key=?", (key,))
+    return row["value"] if row else None
+
+
+def set_state(key: str, value: str) -> None:
+    db_execute("INSERT OR REPLACE INTO state (key, value) VALUES (?, ?)", (key, value))
+
+
+# (whole second, its formatted prefix); timestamps within the same second reuse the prefix
+_iso_second: Tuple[int, str] = (-1, "")
+
+
+def _now_iso() -> str:
+    """Current UTC time in the same format as datetime.now(timezone.utc).isoformat(timespec="microseconds")."""
+    global _iso_second
+    now = time.time()
+    second = int(now)
+    cached_second, prefix = _iso_second
+    if second != cached_second:
+        prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(second))
+        _iso_second = (second, prefix)
+    return f"{prefix}.{int((now - second) * 1_000_000):06d}+00:00"
+
+
+def _insert_action(conn: sqlite3.Connection, request_id: int, action: str, details: str, now: str) -> None:
+    """Append an actions_log row inside a db_write job."""
+    conn.execute(
         "INSERT INTO actions_log (request_id, action, details, created_at) VALUES (?, ?, ?, ?)",
-        (request_id, action, details, dt.datetime.now(dt.timezone.utc).isoformat()),
+        (request_id, action, details, now),
     )
 
 
+def log_action(request_id: int, action: str, details: str = "") -> None:
+    now = _now_iso()
+    db_write(lambda conn: _insert_action(conn, request_id, action, details, now))
+
+
 # ------------------------------
 # Gmail API Layer
 # ------------------------------
 
 
+# Built services are reused per thread: the underlying httplib2 transport is not thread-safe,
+# and google-auth refreshes the access token in place when it expires. The gmail_* helpers
+# call get_gmail_service() in the thread they run in, so a service never crosses a thread hop.
+_gmail_local = threading.local()
+_label_id_cache: Dict[str, str] = {}
+GMAIL_BATCH_SIZE = 50
+GMAIL_BATCH_MODIFY_SIZE = 1000
+GMAIL_FETCH_WORKERS = 8
+# Long-lived so each worker keeps its per-thread Gmail service between polls
+_gmail_fetch_executor = ThreadPoolExecutor(max_workers=GMAIL_FETCH_WORKERS, thread_name_prefix="gmail-fetch")
+
+
 def get_gmail_service() -> Any:
+    service = getattr(_gmail_local, "service", None)
+    if service is None:
+        service = _build_gmail_service()
+        _gmail_local.service = service
+    return service
+
+
+def _build_gmail_service() -> Any:
     creds = None
     if os.path.exists(GMAIL_TOKEN_FILE):
         creds = Credentials.from_authorized_user_file(GMAIL_TOKEN_FILE, SCOPES)
@@ -313,7 +566,8 @@ def get_gmail_service() -> Any:
     wait=wait_exponential(multiplier=1, min=2, max=20),
     retry=retry_if_exception_type(HttpError),
 )
-def gmail_list_messages(service: Any, label_id: Optional[str], unread_only: bool = True) -> List[str]:
+def gmail_list_messages(label_id: Optional[str], unread_only: bool = True) -> List[str]:
+    service = get_gmail_service()
     query = None
     label_ids = []
     if label_id:
@@ -340,9 +594,9 @@ def gmail_list_messages(service: Any, label_id: Optional[str], unread_only: bool
     wait=wait_exponential(multiplier=1, min=2, max=20),
     retry=retry_if_exception_type(HttpError),
 )
-def gmail_get_message(service: Any, message_id: str) -> Dict[str, Any]:
+def gmail_get_message(message_id: str) -> Dict[str, Any]:
     msg = (
-        service.users()
+        get_gmail_service().users()
         .messages()
         .get(userId="me", id=message_id, format="full")
         .execute()
@@ -350,73 +604,208 @@ def gmail_get_message(service: Any, message_id: str) -> Dict[str, Any]:
     return msg
 
 
+def gmail_get_messages_batch(message_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+    """Fetch many messages through Gmail batch requests; ids that failed are left out of the result."""
+    service = get_gmail_service()
+    messages: Dict[str, Dict[str, Any]] = {}
+
+    def _on_response(request_id: str, response: Any, exception: Optional[Exception]) -> None:
+        if exception is not None:
+            logger.warning("Batched fetch of message %s failed: %s", request_id, exception)
+        else:
+            messages[request_id] = response
+
+    for start in range(0, len(message_ids), GMAIL_BATCH_SIZE):
+        batch = service.new_batch_http_request(callback=_on_response)
+        for mid in message_ids[start:start + GMAIL_BATCH_SIZE]:
+            batch.add(service.users().messages().get(userId="me", id=mid, format="full"), request_id=mid)
+        try:
+            batch.execute()
+        except Exception as e:
+            logger.warning("Batched message fetch failed, falling back to single requests: %s", e)
+    missing = [mid for mid in message_ids if mid not in messages]
+    if missing:
+        messages.update(gmail_get_messages_concurrent(missing))
+    return messages
+
+
+def gmail_get_messages_concurrent(message_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+    """Fetch messages one request each, GMAIL_FETCH_WORKERS at a time; failed ids are left out."""
+
+    def _fetch(mid: str) -> Tuple[str, Optional[Dict[str, Any]]]:
+        # Each worker thread gets its own service via get_gmail_service()
+        try:
+            return mid, gmail_get_message(mid)
+        except Exception as e:
+            logger.warning("Fetching message %s failed: %s", mid, e)
+            return mid, None
+
+    return {mid: msg for mid, msg in _gmail_fetch_executor.map(_fetch, message_ids) if msg is not None}
+
+
 @retry(
     reraise=True,
     stop=stop_after_attempt(3),
     wait=wait_exponential(multiplier=1, min=1, max=10),
     retry=retry_if_exception_type(HttpError),
 )
-def gmail_mark_as_read(service: Any, message_id: str) -> None:
+def gmail_mark_as_read(message_id: str) -> None:
     """Mark a Gmail message as read by removing the UNREAD label."""
-    service.users().messages().modify(
+    get_gmail_service().users().messages().modify(
         userId="me",
         id=message_id,
         body={"removeLabelIds": ["UNREAD"]}
     ).execute()
 
 
-def gmail_get_label_id(service: Any, label_name: str) -> Optional[str]:
+@retry(
+    reraise=True,
+    stop=stop_after_attempt(3),
+    wait=wait_exponential(multiplier=1, min=1, max=10),
+    retry=retry_if_exception_type(HttpError),
+)
+def gmail_mark_as_read_bulk(message_ids: List[str]) -> None:
+    """Mark many Gmail messages as read with messages.batchModify (idempotent, so retries are safe)."""
+    service = get_gmail_service()
+    for start in range(0, len(message_ids), GMAIL_BATCH_MODIFY_SIZE):
+        service.users().messages().batchModify(
+            userId="me",
+            body={"ids": message_ids[start:start + GMAIL_BATCH_MODIFY_SIZE], "removeLabelIds": ["UNREAD"]},
+        ).execute()
+
+
+def _is_retryable_http_error(error: BaseException) -> bool:
+    # 404 from history.list means the start historyId expired; retrying cannot help
+    return isinstance(error, HttpError) and getattr(error.resp, "status", None) != 404
+
+
+@retry(
+    reraise=True,
+    stop=stop_after_attempt(3),
+    wait=wait_exponential(multiplier=1, min=1, max=10),
+    retry=retry_if_exception_type(HttpError),
+)
+def gmail_watch(label_id: Optional[str], topic: str) -> Dict[str, Any]:
+    """Start (or renew) Gmail push notifications for the label to a Pub/Sub topic."""
+    body: Dict[str, Any] = {"topicName": topic, "labelFilterBehavior": "include"}
+    if label_id:
+        body["labelIds"] = [label_id]
+    return get_gmail_service().users().watch(userId="me", body=body).execute()
+
+
+@retry(
+    reraise=True,
+    stop=stop_after_attempt(5),
+    wait=wait_exponential(multiplier=1, min=2, max=20),
+    retry=retry_if_exception(_is_retryable_http_error),
+)
+def gmail_list_history(start_history_id: str, label_id: Optional[str]) -> Tuple[List[str], str]:
+    """Return (new message ids, latest historyId) for messages added since ``start_history_id``."""
+    service = get_gmail_service()
+    ids: List[str] = []
+    seen = set()
+    latest = start_history_id
+    page_token = None
+    while True:
+        results = service.users().history().list(
+            userId="me",
+            startHistoryId=start_history_id,
+            historyTypes=["messageAdded"],
+            labelId=label_id,
+            pageToken=page_token,
+        ).execute()
+        for record in results.get("history", []):
+            for added in record.get("messagesAdded", []):
+                mid = added.get("message", {}).get("id")
+                if mid and mid not in seen:
+                    seen.add(mid)
+                    ids.append(mid)
+        latest = str(results.get("historyId", latest))
+        page_token = results.get("nextPageToken")
+        if not page_token:
+            return ids, latest
+
+
+def gmail_get_history_id() -> str:
+    """Current mailbox historyId, the starting point for history replays."""
+    return str(get_gmail_service().users().getProfile(userId="me").execute()["historyId"])
+
+
+def gmail_get_label_id(label_name: str) -> Optional[str]:
+    cached = _label_id_cache.get(label_name)
+    if cached:
+        return cached
     try:
-        lbls = service.users().labels().list(userId="me").execute().get("labels", [])
+        lbls = get_gmail_service().users().labels().list(userId="me").execute().get("labels", [])
         for lbl in lbls:
             if lbl.get("name") == label_name:
+                _label_id_cache[label_name] = lbl.get("id")
                 return lbl.get("id")
     except Exception as e:
         logger.error("Failed to get label id: %s", e)
     return None
 
 
-def decode_email_body(payload: Dict[str, Any]) -> Tuple[str, str]:
-    """Return (text/plain, text/html) from Gmail payload."""
+def _collect_body_parts(
+    payload: Dict[str, Any], text_bodies: List[Dict[str, Any]], html_bodies: List[Dict[str, Any]]
+) -> None:
+    """Gather (undecoded) text/plain and text/html bodies in document order."""
+    mime = payload.get("mimeType", "")
+    if mime.startswith("multipart"):
+        for part in payload.get("parts", []):
+            part_mime = part.get("mimeType", "")
+            if part_mime == "text/plain":
+                text_bodies.append(part.get("body", {}))
+            elif part_mime == "text/html":
+                html_bodies.append(part.get("body", {}))
+            elif part_mime.startswith("multipart"):
+                # Nested multiparts
+                _collect_body_parts(part, text_bodies, html_bodies)
+    elif mime == "text/plain":
+        text_bodies.append(payload.get("body", {}))
+    elif mime == "text/html":
+        html_bodies.append(payload.get("body", {}))
+
+
+def decode_email_body(payload: Dict[str, Any], want_html: bool = True) -> Tuple[str, str]:
+    """Return (text/plain, text/html) from Gmail payload.
+
+    With ``want_html=False`` the HTML parts are only base64-decoded when there is no usable plain text.
+    """
     def decode_part(body_obj: Dict[str, Any]) -> str:
         data = body_obj.get("data")
         if not data:
             return ""
         return base64.urlsafe_b64decode(data).decode("utf-8", errors="ignore")
 
-    text_part = ""
-    html_part = ""
+    text_bodies: List[Dict[str, Any]] = []
+    html_bodies: List[Dict[str, Any]] = []
+    _collect_body_parts(payload, text_bodies, html_bodies)
 
-    if payload.get("mimeType", "").startswith("multipart"):
-        for part in payload.get("parts", []):
-            mime = part.get("mimeType", "")
-            if mime == "text/plain":
-                text_part += decode_part(part.get("body", {}))
-            elif mime == "text/html":
-                html_part += decode_part(part.get("body", {}))
-            elif mime.startswith("multipart"):
-                # Nested multiparts
-                nested_text, nested_html = decode_email_body(part)
-                text_part += nested_text
-                html_part += nested_html
-    else:
-        mime = payload.get("mimeType", "")
-        if mime == "text/plain":
-            text_part = decode_part(payload.get("body", {}))
-        elif mime == "text/html":
-            html_part = decode_part(payload.get("body", {}))
+    text_part = "".join(decode_part(body) for body in text_bodies)
+    html_part = ""
+    if want_html or not text_part.strip():
+        html_part = "".join(decode_part(body) for body in html_bodies)
 
     return text_part, html_part
 
 
 def html_to_text(html: str) -> str:
-    soup = BeautifulSoup(html, "html.parser")
-    # Remove scripts and styles
-    for tag in soup(["script", "style"]):
-        tag.decompose()
-    text = soup.get_text("\n")
+    if LexborHTMLParser is not None:
+        tree = LexborHTMLParser(html)
+        # Remove scripts and styles
+        for tag in tree.css("script, style"):
+            tag.decompose()
+        root = tree.body or tree.root
+        text = root.text(separator="\n") if root else ""
+    else:
+        soup = BeautifulSoup(html, BS4_PARSER, parse_only=_BODY_STRAINER)
+        # Remove scripts and styles
+        for tag in soup(["script", "style"]):
+            tag.decompose()
+        text = soup.get_text("\n")
     # Normalize whitespace
-    text = re.sub(r"\n\s*\n+", "\n\n", text)
+    text = BLANK_LINES_RE.sub("\n\n", text)
     return text.strip()
 
 
@@ -427,6 +816,11 @@ def extract_header(headers: List[Dict[str, str]], name: str) -> Optional[str]:
     return None
 
 
+def headers_to_dict(headers: List[Dict[str, str]]) -> Dict[str, Optional[str]]:
+    """Map lowercased header names to values; like extract_header, the first occurrence wins."""
+    return {h.get("name", "").lower(): h.get("value") for h in reversed(headers)}
+
+
 def parse_address(addr: str) -> Tuple[str, str]:
     """Return (display_name, email_address)."""
     if not addr:
@@ -479,6 +873,43 @@ QUERY_PATTERNS = [
     re.compile(r"^\s*topic\s*:\s*(.+)$", re.IGNORECASE | re.MULTILINE),
 ]
 
+# HARO / Help a B2B Writer parsing patterns, compiled once at import.
+# Whole-body scans use fast_re (RE2 when installed), so their flags are inline.
+ZERO_WIDTH_RE = fast_re.compile("[\u200B-\u200D\uFEFF]")
+# RE2's \s is ASCII-only; spell out every character stdlib re's \s matches (NBSP blank lines from &nbsp;)
+UNICODE_SPACE_CLASS = "[\t\n\x0b\x0c\r\x1c-\x1f \x85\xa0\u1680\u2000-\u200a\u2028\u2029\u202f\u205f\u3000]"
+BLANK_LINES_RE = fast_re.compile("\n" + UNICODE_SPACE_CLASS + "*\n+")
+HEX_BLOB_RE = fast_re.compile(r"\b[0-9A-Fa-f]{40,}\b")
+BASE64_BLOB_RE = fast_re.compile(r"\b[A-Za-z0-9+/=]{60,}\b")
+
+HARO_QUERY_RE = fast_re.compile(
+    r"(?ims)"
+    r"^\s*(?P<idx>\d+)\)\s*Summary:\s*(?P<summary>.*?)\n+"
+    r"Name:\s*(?P<name>.*?)\n+"
+    r"Category:\s*(?P<category>.*?)\n+"
+    r"Email:\s*(?P<email>.*?)\n+"
+    r"(?:Muck Rack URL:.*?\n+)?"
+    r"Media Outlet:\s*(?P<media>.*?)\n+"
+    r"Deadline:\s*(?P<deadline>.*?)\n+"
+    r"Query:\s*\n+(?P<query>.*?)(?:\n+Back to Top|$)"
+)
+HARO_BLOCK_SPLIT_RE = re.compile(r"^\s*(?=\d+\)\s*Summary:)", re.MULTILINE)
+HARO_BLOCK_START_RE = re.compile(r"^\d+\)")
+HARO_BLOCK_INDEX_RE = re.compile(r"^\s*(\d+)")
+HARO_BLOCK_QUERY_RE = re.compile(r"Query\s*:\s*\n+(.*?)(?:\n+Back to Top|$)", re.IGNORECASE | re.DOTALL)
+HARO_BLOCK_FIELD_RES = {
+    label: re.compile(rf"{label}\s*:\s*(.+?)\n+", re.IGNORECASE | re.DOTALL)
+    for label in ("Summary", "Name", "Category", "Email", "Media Outlet", "Deadline")
+}
+
+B2B_FIELD_RES = {
+    label: re.compile(rf"^\s*{re.escape(label)}\s*:\s*(.+)$", re.IGNORECASE | re.MULTILINE)
+    for label in ("Title", "Writer", "Publication", "Deadline", "Industries")
+}
+B2B_REQUEST_RE = re.compile(r"Writer's Request:\s*(.+?)(?:\n\nDeadline:|\nDeadline:|\Z)", re.IGNORECASE | re.DOTALL)
+B2B_REPLY_EMAIL_RE = re.compile(r"To submit a quote, please email the writer:\s*(\S+@helpab2bwriter\.com)", re.IGNORECASE)
+B2B_REPLY_EMAIL_FALLBACK_RE = re.compile(r"email the writer\s*:\s*(\S+@helpab2bwriter\.com)", re.IGNORECASE)
+
 
 def extract_first(patterns: List[re.Pattern], text: str) -> Optional[str]:
     for p in patterns:
@@ -488,9 +919,9 @@ def extract_first(patterns: List[re.Pattern], text: str) -> Optional[str]:
     return None
 
 
-def _detect_provider(subject: str, headers: List[Dict[str, str]], body_text: str) -> Optional[str]:
-    from_header = extract_header(headers, "From") or ""
-    list_id = extract_header(headers, "List-Id") or ""
+def _detect_provider(subject: str, header_dict: Dict[str, Optional[str]], body_text: str) -> Optional[str]:
+    from_header = header_dict.get("from") or ""
+    list_id = header_dict.get("list-id") or ""
     if "helpareporter.com" in from_header.lower() or "haro" in subject.lower() or "helpareporter" in list_id.lower():
         return "HARO"
     if "helpab2bwriter.com" in body_text.lower() or "Help a B2B Writer".lower() in body_text.lower() or "help a b2b writer" in subject.lower():
@@ -498,14 +929,39 @@ def _detect_provider(subject: str, headers: List[Dict[str, str]], body_text: str
     return None
 
 
+def _contains_any_keyword(text: str, keywords: set, automaton: Any) -> bool:
+    """Substring match of any keyword: one automaton pass, or one scan per keyword without it."""
+    if automaton is not None:
+        return next(automaton.iter(text), None) is not None
+    return any(kw in text for kw in keywords)
+
+
+def _haro_item_text(it: Dict[str, Any]) -> str:
+    """Text the HARO keyword filters look at for one parsed query."""
+    return " ".join(
+        [
+            it.get("summary") or "",
+            it.get("category") or "",
+            it.get("media_outlet") or "",
+            it.get("query") or "",
+        ]
+    )
+
+
+def _is_haro_excluded(text: str) -> bool:
+    """True when lowercased ``text`` mentions any HARO exclude keyword."""
+    return bool(HARO_EXCLUDE_KEYWORDS) and _contains_any_keyword(
+        text, HARO_EXCLUDE_KEYWORDS, HARO_EXCLUDE_AUTOMATON
+    )
+
+
 def _should_include_haro_query(blob: str) -> bool:
     text = blob.lower()
     if HARO_INCLUDE_KEYWORDS:
-        if not any(kw in text for kw in HARO_INCLUDE_KEYWORDS):
-            return False
-    if HARO_EXCLUDE_KEYWORDS:
-        if any(kw in text for kw in HARO_EXCLUDE_KEYWORDS):
+        if not _contains_any_keyword(text, HARO_INCLUDE_KEYWORDS, HARO_INCLUDE_AUTOMATON):
             return False
+    if _is_haro_excluded(text):
+        return False
     return True
 
 
@@ -515,39 +971,27 @@ def _parse_haro_queries(body_text: str) -> List[Dict[str, Optional[str]]]:
     """
     def clean_haro_text(text: str) -> str:
         # Remove zero-width and BOM chars
-        text = re.sub(r"[\u200B-\u200D\uFEFF]", "", text)
+        text = ZERO_WIDTH_RE.sub("", text)
         # Normalize multiple blank lines
-        text = re.sub(r"\n\s*\n+", "\n\n", text)
+        text = BLANK_LINES_RE.sub("\n\n", text)
         return text
 
     # Clean the body before parsing
     text = clean_haro_text(body_text)
 
-    # Regex to capture sections (more permissive newlines, case-insensitive)
-    pattern = re.compile(
-        r"^\s*(?P<idx>\d+)\)\s*Summary:\s*(?P<summary>.*?)\n+"
-        r"Name:\s*(?P<name>.*?)\n+"
-        r"Category:\s*(?P<category>.*?)\n+"
-        r"Email:\s*(?P<email>.*?)\n+"
-        r"(?:Muck Rack URL:.*?\n+)?"
-        r"Media Outlet:\s*(?P<media>.*?)\n+"
-        r"Deadline:\s*(?P<deadline>.*?)\n+"
-        r"Query:\s*\n+(?P<query>.*?)(?:\n+Back to Top|$)",
-        re.DOTALL | re.MULTILINE | re.IGNORECASE,
-    )
-
     # Cleaner for encoded noise inside query bodies (hex/base64 blobs pasted by HARO)
     def clean_query_blob(q: str) -> str:
-        q = re.sub(r"[\u200B-\u200D\uFEFF]", "", q)
+        q = ZERO_WIDTH_RE.sub("", q)
         # Remove very long base64/hex-like runs that are not human content
-        q = re.sub(r"\b[0-9A-Fa-f]{40,}\b", "", q)  # long hex
-        q = re.sub(r"\b[A-Za-z0-9+/=]{60,}\b", "", q)  # long base64-like
+        q = HEX_BLOB_RE.sub("", q)  # long hex
+        q = BASE64_BLOB_RE.sub("", q)  # long base64-like
         # Collapse excessive whitespace
-        q = re.sub(r"\n\s*\n+", "\n\n", q).strip()
+        q = BLANK_LINES_RE.sub("\n\n", q).strip()
         return q
 
     items: List[Dict[str, Optional[str]]] = []
-    for m in pattern.finditer(text):
+    # Capture sections (more permissive newlines, case-insensitive)
+    for m in HARO_QUERY_RE.finditer(text):
         items.append(
             {
                 "idx": m.group("idx"),
@@ -563,19 +1007,20 @@ def _parse_haro_queries(body_text: str) -> List[Dict[str, Optional[str]]]:
 
     # Fallback: if parser failed to find any items, try a simpler split and parse
     if not items:
-        blocks = re.split(r"^\s*(?=\d+\)\s*Summary:)", text, flags=re.MULTILINE)
+        blocks = HARO_BLOCK_SPLIT_RE.split(text)
         for blk in blocks:
-            if not blk.strip().startswith("1)") and not re.match(r"^\d+\)", blk.strip()):
+            if not blk.strip().startswith("1)") and not HARO_BLOCK_START_RE.match(blk.strip()):
                 continue
             def find(label: str) -> Optional[str]:
-                m = re.search(rf"{label}\s*:\s*(.+?)\n+", blk, re.IGNORECASE | re.DOTALL)
+                m = HARO_BLOCK_FIELD_RES[label].search(blk)
                 return m.group(1).strip() if m else None
-            q_match = re.search(r"Query\s*:\s*\n+(.*?)(?:\n+Back to Top|$)", blk, re.IGNORECASE | re.DOTALL)
+            q_match = HARO_BLOCK_QUERY_RE.search(blk)
             q_text = clean_query_blob(q_match.group(1).strip()) if q_match else None
             if q_text:
+                idx_match = HARO_BLOCK_INDEX_RE.match(blk)
                 items.append(
                     {
-                        "idx": re.match(r"^\s*(\d+)", blk).group(1) if re.match(r"^\s*(\d+)", blk) else None,
+                        "idx": idx_match.group(1) if idx_match else None,
                         "summary": find("Summary") or "",
                         "name": find("Name") or "",
                         "category": find("Category") or "",
@@ -589,9 +1034,28 @@ def _parse_haro_queries(body_text: str) -> List[Dict[str, Optional[str]]]:
     return items
 
 
+def _parse_haro_queries_with_gemini(body_text: str) -> List[Dict[str, Any]]:
+    """Parse a HARO digest and, with Gemini filtering on, annotate each query with its analysis."""
+    items = _parse_haro_queries(body_text)
+    if USE_GEMINI_FILTERING and items:
+        # One batched Gemini request per GEMINI_BATCH_SIZE queries instead of one per query
+        # Obvious rejects (no topic keyword, too little content) are resolved inside
+        # should_include_queries_gemini without a Gemini call
+        decisions = should_include_queries_gemini(
+            [
+                (it.get("query") or "", it.get("summary") or "", it.get("category") or "")
+                for it in items
+            ]
+        )
+        for it, (is_relevant, analysis) in zip(items, decisions):
+            it["gemini_analysis"] = analysis
+            it["gemini_relevant"] = is_relevant
+    return items
+
+
 def _parse_help_b2b_writer(body_text: str) -> Dict[str, Optional[str]]:
     def find_one(label: str) -> Optional[str]:
-        m = re.search(rf"^\s*{re.escape(label)}\s*:\s*(.+)$", body_text, re.IGNORECASE | re.MULTILINE)
+        m = B2B_FIELD_RES[label].search(body_text)
         return m.group(1).strip() if m else None
 
     title = find_one("Title")
@@ -601,14 +1065,14 @@ def _parse_help_b2b_writer(body_text: str) -> Dict[str, Optional[str]]:
     industries = find_one("Industries")
     
     # Writer's Request block - updated pattern to handle the new format
-    req_match = re.search(r"Writer's Request:\s*(.+?)(?:\n\nDeadline:|\nDeadline:|\Z)", body_text, re.IGNORECASE | re.DOTALL)
+    req_match = B2B_REQUEST_RE.search(body_text)
     request_text = req_match.group(1).strip() if req_match else body_text
     
     # Reply email - updated pattern to handle the new format
-    em = re.search(r"To submit a quote, please email the writer:\s*(\S+@helpab2bwriter\.com)", body_text, re.IGNORECASE)
+    em = B2B_REPLY_EMAIL_RE.search(body_text)
     if not em:
         # Fallback to the old pattern
-        em = re.search(r"email the writer\s*:\s*(\S+@helpab2bwriter\.com)", body_text, re.IGNORECASE)
+        em = B2B_REPLY_EMAIL_FALLBACK_RE.search(body_text)
     reply_email = em.group(1).strip() if em else ""
     
     return {
@@ -626,10 +1090,14 @@ def parse_email_to_requests(msg: Dict[str, Any]) -> List[ParsedRequest]:
     payload = msg.get("payload", {})
     headers = payload.get("headers", [])
 
-    subject = extract_header(headers, "Subject") or "(no subject)"
-    from_header = extract_header(headers, "From") or ""
-    reply_to_header = extract_header(headers, "Reply-To") or from_header
-    date_header = extract_header(headers, "Date")
+    # Shared (not copied) by every request parsed from this email
+    headers_map = {h.get("name"): h.get("value") for h in headers}
+
+    header_dict = headers_to_dict(headers)
+    subject = header_dict.get("subject") or "(no subject)"
+    from_header = header_dict.get("from") or ""
+    reply_to_header = header_dict.get("reply-to") or from_header
+    date_header = header_dict.get("date")
 
     sender_name, sender_email = parse_address(from_header)
     _, reply_to_email = parse_address(reply_to_header)
@@ -640,44 +1108,24 @@ def parse_email_to_requests(msg: Dict[str, Any]) -> List[ParsedRequest]:
             received_dt = email.utils.parsedate_to_datetime(date_header)
             received_at = received_dt.isoformat()
     except Exception:
-        received_at = dt.datetime.now(dt.timezone.utc).isoformat()
+        received_at = _now_iso()
 
-    text_body, html_body = decode_email_body(payload)
+    text_body, html_body = decode_email_body(payload, want_html=False)
     body_text = text_body.strip() or html_to_text(html_body)
 
-    provider = _detect_provider(subject, headers, body_text)
+    provider = _detect_provider(subject, header_dict, body_text)
 
     requests: List[ParsedRequest] = []
     if provider == "HARO":
         # Parse with regex; if Gemini filtering is enabled, annotate items with analysis
-        items = _parse_haro_queries(body_text)
-        if USE_GEMINI_FILTERING:
-            enriched_items: List[Dict[str, Optional[str]]] = []
-            for it in items:
-                query_text = it.get("query") or ""
-                summary_text = it.get("summary") or ""
-                category_text = it.get("category") or ""
-                is_relevant, analysis = should_include_query_gemini(query_text, summary_text, category_text)
-                it["gemini_analysis"] = analysis
-                it["gemini_relevant"] = is_relevant
-                enriched_items.append(it)
-            items = enriched_items
+        items = _parse_haro_queries_with_gemini(body_text)
         for i, it in enumerate(items, start=1):
-            # Apply keyword filters
-            blob = " ".join(
-                [
-                    it.get("summary") or "",
-                    it.get("category") or "",
-                    it.get("media_outlet") or "",
-                    it.get("query") or "",
-                ]
-            )
             # Prefer Gemini decision when available; otherwise fallback to keyword/Gemini blob analysis
             if it.get("gemini_relevant") is True:
                 pass
             elif it.get("gemini_relevant") is False:
                 continue
-            elif not _should_include_haro_query(blob):
+            elif not _should_include_haro_query(_haro_item_text(it)):
                 continue
 
             # Build ParsedRequest for each query, set reply_to to HARO per-query email
@@ -691,7 +1139,7 @@ def parse_email_to_requests(msg: Dict[str, Any]) -> List[ParsedRequest]:
                 deadline=deadline,
                 requirements=None,
                 query_text=it.get("query") or body_text,
-                original_headers={h.get("name"): h.get("value") for h in headers},
+                original_headers=headers_map,
                 gmail_message_id=f"{msg.get('id','')}::q{i}",
                 gmail_thread_id=msg.get("threadId", ""),
                 summary=it.get("summary") or None,
@@ -720,7 +1168,7 @@ def parse_email_to_requests(msg: Dict[str, Any]) -> List[ParsedRequest]:
             deadline=it.get("deadline"),
             requirements=None,
             query_text=it.get("query") or body_text,
-            original_headers={h.get("name"): h.get("value") for h in headers},
+            original_headers=headers_map,
             gmail_message_id=msg.get("id", ""),
             gmail_thread_id=msg.get("threadId", ""),
             summary=it.get("summary") or None,
@@ -747,7 +1195,7 @@ def parse_email_to_requests(msg: Dict[str, Any]) -> List[ParsedRequest]:
         deadline=deadline,
         requirements=requirements,
         query_text=body_text,
-        original_headers={h.get("name"): h.get("value") for h in headers},
+        original_headers=headers_map,
         gmail_message_id=msg.get("id", ""),
         gmail_thread_id=msg.get("threadId", ""),
         provider=None,
@@ -755,20 +1203,48 @@ def parse_email_to_requests(msg: Dict[str, Any]) -> List[ParsedRequest]:
     return [parsed]
 
 
-def upsert_request(parsed: ParsedRequest) -> int:
-    existing = db_query_one(
-        "SELECT id FROM requests WHERE gmail_message_id = ?", (parsed.gmail_message_id,)
-    )
-    now = dt.datetime.now(dt.timezone.utc).isoformat()
-    if existing:
-        request_id = int(existing["id"])
-        db_execute(
-            """
-            UPDATE requests SET subject=?, sender=?, sender_email=?, reply_to=?, received_at=?, deadline=?,
-                requirements=?, query_text=?, status=?, original_headers=?, gmail_thread_id=?, updated_at=?
-            WHERE id=?
-            """,
-            (
+def _json_dumps(obj: Any) -> str:
+    # Header names can be None; OPT_NON_STR_KEYS serializes them as "null" like json.dumps
+    return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+
+
+@functools.lru_cache(maxsize=256)
+def _parse_original_headers(stored: str) -> Dict[str, Any]:
+    return orjson.loads(stored)
+
+
+def load_original_headers(stored: Optional[str]) -> Dict[str, Any]:
+    """Decode a requests.original_headers value; the returned dict is shared and must not be mutated."""
+    # Keyed on the stored JSON itself, so a re-upserted row never returns stale headers
+    return _parse_original_headers(stored) if stored else {}
+
+
+def upsert_requests_bulk(parsed_list: List[ParsedRequest]) -> List[int]:
+    """Insert or update many parsed requests in one transaction; returns ids in input order."""
+    if not parsed_list:
+        return []
+    now = _now_iso()
+    # Later duplicates of a message id win, as they would with sequential upserts
+    by_message_id = {parsed.gmail_message_id: parsed for parsed in parsed_list}
+    message_ids = list(by_message_id)
+    placeholders = ",".join("?" * len(message_ids))
+
+    def _upsert(conn: sqlite3.Connection) -> Dict[str, int]:
+        cur = conn.cursor()
+        cur.execute(
+            f"SELECT id, gmail_message_id FROM requests WHERE gmail_message_id IN ({placeholders})",
+            message_ids,
+        )
+        existing = {row["gmail_message_id"]: int(row["id"]) for row in cur.fetchall()}
+        updates = []
+        inserts = []
+        # Requests from one digest share a headers dict; encode each distinct dict once
+        headers_json: Dict[int, str] = {}
+        for mid, parsed in by_message_id.items():
+            headers_key = id(parsed.original_headers)
+            if headers_key not in headers_json:
+                headers_json[headers_key] = _json_dumps(parsed.original_headers)
+            fields = (
                 parsed.subject,
                 parsed.sender,
                 parsed.sender_email,
@@ -778,50 +1254,43 @@ def upsert_request(parsed: ParsedRequest) -> int:
                 parsed.requirements,
                 parsed.query_text,
                 "new",
-                json.dumps(parsed.original_headers),
-                parsed.gmail_thread_id,
-                now,
-                request_id,
-            ),
+                headers_json[headers_key],
+            )
+            if mid in existing:
+                updates.append((*fields, parsed.gmail_thread_id, now, existing[mid]))
+            else:
+                inserts.append((mid, parsed.gmail_thread_id, *fields, now, now))
+        if updates:
+            cur.executemany(
+                """
+                UPDATE requests SET subject=?, sender=?, sender_email=?, reply_to=?, received_at=?, deadline=?,
+                    requirements=?, query_text=?, status=?, original_headers=?, gmail_thread_id=?, updated_at=?
+                WHERE id=?
+                """,
+                updates,
+            )
+        if inserts:
+            cur.executemany(
+                """
+                INSERT INTO requests (
+                    gmail_message_id, gmail_thread_id, subject, sender, sender_email, reply_to, received_at,
+                    deadline, requirements, query_text, status, original_headers, created_at, updated_at
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                inserts,
+            )
+            cur.execute(
+                f"SELECT id, gmail_message_id FROM requests WHERE gmail_message_id IN ({placeholders})",
+                message_ids,
+            )
+            existing = {row["gmail_message_id"]: int(row["id"]) for row in cur.fetchall()}
+        logger.info(
+            "upsert_requests_bulk: %d inserted, %d updated in one transaction", len(inserts), len(updates)
         )
-        return request_id
-    else:
-        with _db_lock:
-            conn = get_db_connection()
-            try:
-                cur = conn.cursor()
-                cur.execute(
-                    """
-                    INSERT INTO requests (
-                        gmail_message_id, gmail_thread_id, subject, sender, sender_email, reply_to, received_at,
-                        deadline, requirements, query_text, status, original_headers, created_at, updated_at
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    """,
-                    (
-                        parsed.gmail_message_id,
-                        parsed.gmail_thread_id,
-                        parsed.subject,
-                        parsed.sender,
-                        parsed.sender_email,
-                        parsed.reply_to,
-                        parsed.received_at,
-                        parsed.deadline,
-                        parsed.requirements,
-                        parsed.query_text,
-                        "new",
-                        json.dumps(parsed.original_headers),
-                        now,
-                        now,
-                    ),
-                )
-                request_id = cur.lastrowid
-                conn.commit()
-                logger.info("upsert_request: Created new request with ID %d for gmail_message_id %s", request_id, parsed.gmail_message_id)
-                if request_id == 0:
-                    logger.error("upsert_request: lastrowid returned 0! This indicates a database issue.")
-                return request_id
-            finally:
-                conn.close()
+        return existing
+
+    existing = db_write(_upsert)
+    return [existing[parsed.gmail_message_id] for parsed in parsed_list]
 
 
 # ------------------------------
@@ -829,81 +1298,92 @@ def upsert_request(parsed: ParsedRequest) -> int:
 # ------------------------------
 
 
+# Used when the template file is missing
+DEFAULT_PROMPT_TEMPLATE = textwrap.dedent(
+    """
+    You are Bezal John Benny, Founder of Mavericks Edge — a consulting firm based in Edmonton, Alberta, founded in 2017. You respond to media/source requests with grounded, experience-led insight.
+
+    Company context (for credibility and examples when relevant):
+    - Mavericks Edge helps solopreneurs, SMBs, nonprofits, and early-stage organizations thrive by blending human-centered consulting with cutting-edge AI and automation.
+    - We build custom web applications, immersive 3D websites, and ecommerce platforms that drive measurable results in sales and engagement.
+    - Full-service digital marketing includes SEO, PPC, and social — focused on visibility, trust, and conversions.
+    - AI is woven into delivery: intelligent chatbots and workflow automation that cut costs and free teams to focus on what matters.
+    - We create adaptive digital ecosystems that learn, optimize, and grow alongside the business, from concept to launch to long-term support.
+
+    About Bezal (use briefly when it bolsters relevance):
+    - BSc in Music Technology (Birmingham City University) and MSc (University of Victoria).
+    - 10+ years bridging creativity and technology across large-scale technical installs and AI-driven web, marketing, and automation.
+    - Philosophy: technology should amplify human potential; design solutions that feel authentic, purposeful, and effective.
+
+    Input:
+    - Request subject: {{subject}}
+    - Request sender: {{sender}} <{{sender_email}}>
+    - Recipient first name (if known): {{first_name}}
+    - Deadline (if any): {{deadline}}
+    - Requirements (if any): {{requirements}}
+    - Full request text:
+    ---
+    {{query_text}}
+    ---
+
+    Task:
+    - Draft a concise, credible response that demonstrates expertise and relevance.
+    - Include a compelling subject line tailored to the query.
+    - Use a casual, humble, polite, friendly, conversational tone (as if speaking to a colleague) while remaining professional. Keep skimmable structure (short paragraphs; no bullets or bold).
+    - Provide 2-4 specific, insightful points tied to the query.
+    - Proof: include one proof point (metric, brief case note) tied to Mavericks Edge/Bezal when relevant.
+    - Plain text: no attachments; max one link only if essential.
+    - Close with a direct follow-up invitation (email only).
+    - Keep to 150-250 words in the body unless complexity requires more. Exactly 2 paragraphs.
+    - Keep JSON schema strict: subject, body (no extra keys).
+    - Stay within anti-AI style rules (already defined below).
+
+    Hard constraints (do not violate):
+    - Do NOT use markdown formatting (no **bold**, lists, or headers). Plain text only.
+    - Body must be exactly 2 paragraphs between greeting and closing.
+    - MUST include a personalized greeting (e.g., "Hi [Name]!" or "Hello [Name],")
+    - MUST include "Best regards," before the signature.
+    - MUST end with this exact signature:
+      Bezal John Benny
+      Founder | Mavericks Edge
+      bezal.benny@mavericksedge.ca
+      C: +1 (250) 883-8849
+
+    Style constraints (avoid AI telltales):
+    - Vary sentence length; include at least one short punchy line.
+    - Limit em dashes — prefer commas or parentheses; no more than one em dash total.
+    - No formulaic openers (e.g., "In today's fast-paced world", "It's no secret that").
+    - Minimize hedging: avoid phrases like "it's important to note", "in many ways", "often" at sentence starts.
+    - Use natural transitions; avoid "Additionally", "Moreover", "On the other hand" at sentence starts.
+    - Keep bullets uneven (2–4 items max) and concise; no subheadings.
+    - Prefer contractions (it's, we're, don't) where natural.
+    - Avoid predictable closers (no "In conclusion"/"Ultimately"). End plainly.
+    - Avoid over-enthusiastic adjectives (e.g., incredible, transformative, exciting) unless directly quoted.
+    - Use specific, non-generic examples; skip default big-tech examples unless the query mentions them.
+    - Allow a light, opinionated stance when appropriate (e.g., "this trade-off hurts small teams").
+    - Avoid repeating the same idea in different words; remove restatements.
+
+    Output JSON exactly with keys: subject, body
+    """
+).strip()
+
+
 def load_prompt_template() -> str:
     template_path = os.getenv(
         "GEMINI_PROMPT_TEMPLATE_PATH", "templates/gemini_prompt_template.md"
     )
-    if os.path.exists(template_path):
-        with open(template_path, "r", encoding="utf-8") as f:
-            return f.read()
-    # Fallback default
-    return textwrap.dedent(
-        """
-        You are Bezal John Benny, Founder of Mavericks Edge — a consulting firm based in Edmonton, Alberta, founded in 2017. You respond to media/source requests with grounded, experience-led insight.
-
-        Company context (for credibility and examples when relevant):
-        - Mavericks Edge helps solopreneurs, SMBs, nonprofits, and early-stage organizations thrive by blending human-centered consulting with cutting-edge AI and automation.
-        - We build custom web applications, immersive 3D websites, and ecommerce platforms that drive measurable results in sales and engagement.
-        - Full-service digital marketing includes SEO, PPC, and social — focused on visibility, trust, and conversions.
-        - AI is woven into delivery: intelligent chatbots and workflow automation that cut costs and free teams to focus on what matters.
-        - We create adaptive digital ecosystems that learn, optimize, and grow alongside the business, from concept to launch to long-term support.
-
-        About Bezal (use briefly when it bolsters relevance):
-        - BSc in Music Technology (Birmingham City University) and MSc (University of Victoria).
-        - 10+ years bridging creativity and technology across large-scale technical installs and AI-driven web, marketing, and automation.
-        - Philosophy: technology should amplify human potential; design solutions that feel authentic, purposeful, and effective.
-
-        Input:
-        - Request subject: {{subject}}
-        - Request sender: {{sender}} <{{sender_email}}>
-        - Recipient first name (if known): {{first_name}}
-        - Deadline (if any): {{deadline}}
-        - Requirements (if any): {{requirements}}
-        - Full request text:
-        ---
-        {{query_text}}
-        ---
-
-        Task:
-        - Draft a concise, credible response that demonstrates expertise and relevance.
-        - Include a compelling subject line tailored to the query.
-        - Use a casual, humble, polite, friendly, conversational tone (as if speaking to a colleague) while remaining professional. Keep skimmable structure (short paragraphs; no bullets or bold).
-        - Provide 2-4 specific, insightful points tied to the query.
-        - Proof: include one proof point (metric, brief case note) tied to Mavericks Edge/Bezal when relevant.
-        - Plain text: no attachments; max one link only if essential.
-        - Close with a direct follow-up invitation (email only).
-        - Keep to 150-250 words in the body unless complexity requires more. Exactly 2 paragraphs.
-        - Keep JSON schema strict: subject, body (no extra keys).
-        - Stay within anti-AI style rules (already defined below).
-
-        Hard constraints (do not violate):
-        - Do NOT use markdown formatting (no **bold**, lists, or headers). Plain text only.
-        - Body must be exactly 2 paragraphs between greeting and closing.
-        - MUST include a personalized greeting (e.g., "Hi [Name]!" or "Hello [Name],")
-        - MUST include "Best regards," before the signature.
-        - MUST end with this exact signature:
-          Bezal John Benny
-          Founder | Mavericks Edge
-          bezal.benny@mavericksedge.ca
-          C: +1 (250) 883-8849
-
-        Style constraints (avoid AI telltales):
-        - Vary sentence length; include at least one short punchy line.
-        - Limit em dashes — prefer commas or parentheses; no more than one em dash total.
-        - No formulaic openers (e.g., "In today's fast-paced world", "It's no secret that").
-        - Minimize hedging: avoid phrases like "it's important to note", "in many ways", "often" at sentence starts.
-        - Use natural transitions; avoid "Additionally", "Moreover", "On the other hand" at sentence starts.
-        - Keep bullets uneven (2–4 items max) and concise; no subheadings.
-        - Prefer contractions (it's, we're, don't) where natural.
-        - Avoid predictable closers (no "In conclusion"/"Ultimately"). End plainly.
-        - Avoid over-enthusiastic adjectives (e.g., incredible, transformative, exciting) unless directly quoted.
-        - Use specific, non-generic examples; skip default big-tech examples unless the query mentions them.
-        - Allow a light, opinionated stance when appropriate (e.g., "this trade-off hurts small teams").
-        - Avoid repeating the same idea in different words; remove restatements.
-
-        Output JSON exactly with keys: subject, body
-        """
-    ).strip()
+    try:
+        mtime_ns = os.stat(template_path).st_mtime_ns
+    except OSError:
+        return DEFAULT_PROMPT_TEMPLATE
+    return _read_prompt_template(template_path, mtime_ns)
+
+
+@functools.lru_cache(maxsize=1)
+def _read_prompt_template(template_path: str, mtime_ns: int) -> str:
+    # Keyed on the file's mtime so edits to the template are still picked up without a restart
+    with open(template_path, "r", encoding="utf-8") as f:
+        return f.read()
 
 
 def interpolate_template(template: str, variables: Dict[str, str]) -> str:
@@ -913,12 +1393,399 @@ def interpolate_template(template: str, variables: Dict[str, str]) -> str:
     return result
 
 
+PROMPT_INPUT_NOTE = "Input: the request details are provided in the user message."
+
+# Gemini rejects cached content below a per-model minimum (1024 tokens for 2.5 Flash)
+GEMINI_DRAFT_CACHE_MIN_TOKENS = 1024
+
+
+@dataclass
+class _DraftCacheEntry:
+    model: Optional[genai.GenerativeModel]  # bound to the cached content; None sends full prompts
+    cached_content: Any  # the CachedContent to delete once it is replaced
+    refresh_at: float  # monotonic time to recreate it (float("inf") when caching can never apply)
+    refreshing: bool = False
+
+
+# (GEMINI_MODEL, static instructions) -> current cached content for that prompt
+_draft_cache_models: Dict[Tuple[str, str], _DraftCacheEntry] = {}
+_draft_cache_lock = threading.Lock()
+
+
+@functools.lru_cache(maxsize=4)
+def split_prompt_template(template: str) -> Tuple[str, str]:
+    """Split a template into (static instructions, per-request input) around its placeholders.
+
+    The input part is the run of blank-line separated paragraphs from the first to the last
+    ``{{placeholder}}``; the static part is everything else. Templates without placeholders
+    return an empty static part.
+    """
+    paragraphs = template.split("\n\n")
+    marked = [i for i, paragraph in enumerate(paragraphs) if "{{" in paragraph]
+    if not marked:
+        return "", template
+    first, last = marked[0], marked[-1]
+    static_part = "\n\n".join(paragraphs[:first] + [PROMPT_INPUT_NOTE] + paragraphs[last + 1:])
+    return static_part, "\n\n".join(paragraphs[first:last + 1])
+
+
+def _create_draft_cache(static_prompt: str) -> _DraftCacheEntry:
+    """Create cached content for ``static_prompt``; network calls, so never under the lock."""
+    # Refresh a minute early so requests never reference content that is about to expire
+    refresh_at = time.monotonic() + max(0, GEMINI_DRAFT_CACHE_TTL_SECONDS - 60)
+    try:
+        tokens = _get_draft_model().count_tokens(static_prompt).total_tokens
+        if tokens < GEMINI_DRAFT_CACHE_MIN_TOKENS:
+            # Creation would fail on every draft; remember that until the template changes
+            logger.info(
+                "Draft prompt has %d tokens (< %d cacheable); sending full prompts", tokens, GEMINI_DRAFT_CACHE_MIN_TOKENS
+            )
+            return _DraftCacheEntry(None, None, float("inf"))
+        cached_content = genai.caching.CachedContent.create(
+            model=GEMINI_MODEL,
+            display_name="draft-prompt",
+            system_instruction=static_prompt,
+            ttl=dt.timedelta(seconds=GEMINI_DRAFT_CACHE_TTL_SECONDS),
+        )
+        logger.info("Created Gemini cached content %s for draft prompt", cached_content.name)
+        return _DraftCacheEntry(genai.GenerativeModel.from_cached_content(cached_content), cached_content, refresh_at)
+    except Exception as e:
+        # Remembered for one TTL so a failing API is not retried on every draft
+        logger.warning("Gemini context caching unavailable, sending full prompts: %s", e)
+        return _DraftCacheEntry(None, None, refresh_at)
+
+
+def _delete_draft_cache(cached_content: Any) -> None:
+    """Delete replaced cached content so it is not billed until its TTL runs out (best effort)."""
+    if cached_content is None:
+        return
+    try:
+        cached_content.delete()
+    except Exception as e:
+        logger.debug("Could not delete Gemini cached content %s: %s", getattr(cached_content, "name", "?"), e)
+
+
+def _get_cached_draft_model(static_prompt: str) -> Optional[genai.GenerativeModel]:
+    """Model reading ``static_prompt`` from Gemini cached content, or None to send the full prompt."""
+    if not USE_GEMINI_DRAFT_CACHE or not static_prompt:
+        return None
+    key = (GEMINI_MODEL, static_prompt)
+    with _draft_cache_lock:
+        entry = _draft_cache_models.get(key)
+        if entry is not None and (entry.refresh_at > time.monotonic() or entry.refreshing):
+            # While one draft recreates the content the others keep using the current one,
+            # which stays valid for the minute of slack left before its TTL
+            return entry.model
+        if entry is None:
+            # First use: other drafts send full prompts until the content exists
+            _draft_cache_models[key] = _DraftCacheEntry(None, None, 0.0, refreshing=True)
+        else:
+            entry.refreshing = True
+    fresh = _create_draft_cache(static_prompt)
+    with _draft_cache_lock:
+        # Only the current prompt's content is kept; older templates' contents are dropped
+        replaced = list(_draft_cache_models.values())
+        _draft_cache_models.clear()
+        _draft_cache_models[key] = fresh
+    for old in replaced:
+        _delete_draft_cache(old.cached_content)
+    return fresh.model
+
+
+@functools.lru_cache(maxsize=1)
+def _get_draft_model() -> genai.GenerativeModel:
+    # The SDK is configured once in main(); the model keeps its client across drafts
+    return genai.GenerativeModel(GEMINI_MODEL)
+
+
+def _invalidate_cached_draft_model(static_prompt: str, failed_model: Any) -> None:
+    """Force a refresh of the cached draft model, unless another thread already replaced the one that failed."""
+    with _draft_cache_lock:
+        entry = _draft_cache_models.get((GEMINI_MODEL, static_prompt))
+        if entry is not None and entry.model is failed_model and not entry.refreshing:
+            entry.refresh_at = 0.0
+
+
+# ------------------------------
+# Draft post-processing
+# ------------------------------
+
+# Formulaic openers and stock phrases (removed)
+HUMANIZE_STOCK_PHRASES = (
+    r"In today's (?:fast-paced|ever[- ]changing) world",
+    r"It's no secret that",
+    r"At the end of the day",
+    r"Ultimately,",
+    r"In conclusion,",
+    r"Additionally,",
+    r"Moreover,",
+    r"On the other hand,",
+    r"It is important to note that",
+)
+# Over-enthusiastic adjectives (toned down to "strong" unless part of a quote)
+HUMANIZE_EXUBERANT_WORDS = (
+    "incredible", "transformative", "exciting", "revolutionary", "game-changing",
+    "unprecedented", "amazing", "remarkable", "cutting-edge",
+)
+# Brand-name clichés (case-sensitive; skipped when the query mentions the brand)
+HUMANIZE_BIG_BRANDS = ("Tesla", "Apple", "Google", "Amazon", "Microsoft")
+# Replacement for each named alternative of the lexical scan
+HUMANIZE_LEXICAL_REPLACEMENTS = {"phrase": "", "exuberant": "strong", "brand": "a well-known player"}
+# Contractions; "it is" yields to "is not" so "it is not" still becomes "it isn't"
+HUMANIZE_CONTRACTIONS_RE = re.compile(
+    r"\b(?:(?P<do_not>do not)|(?P<is_not>is not)|(?P<we_are>we are)|(?P<it_is>it is(?! not\b)))\b",
+    re.IGNORECASE,
+)
+HUMANIZE_CONTRACTIONS = {"do_not": "don't", "is_not": "isn't", "we_are": "we're", "it_is": "it's"}
+SENTENCE_SPLIT_RE = re.compile(r"(?<=[.!?])\s+")
+
+
+class _NonWordToSpace(dict):
+    """str.translate table mapping every non-word character (regex \\W) to a space.
+
+    Filled lazily per code point, so the usual ASCII and punctuation set is learned once
+    and later lookups stay in C.
+    """
+
+    def __missing__(self, codepoint: int) -> int:
+        ch = chr(codepoint)
+        value = codepoint if ch.isalnum() or ch == "_" else 32
+        self[codepoint] = value
+        return value
+
+
+NON_WORD_TO_SPACE = _NonWordToSpace()
+
+# Anything the pattern-driven rewrites in _humanize could act on; a superset (every brand,
+# phrases anywhere, line breaks other than "\n") so drafts without a hit can skip those passes.
+# One linear scan with fast_re, hence the inline flags.
+HUMANIZE_QUICK_CHECK_RE = fast_re.compile(
+    "(?im)"
+    + "|".join((
+        *HUMANIZE_STOCK_PHRASES,
+        *HUMANIZE_EXUBERANT_WORDS,
+        r"(?-i:" + "|".join(HUMANIZE_BIG_BRANDS) + ")",
+        r"do not|is not|we are|it is|in conclusion|ultimately|—",
+        r"^\s*[-*] ",
+        "[\r\x0b\x0c\x1c-\x1e\x85\u2028\u2029]",
+    ))
+)
+
+EM_DASH_RANGE_RE = re.compile(r"(\d+)—(\d+)")
+DASH_BULLET_RE = re.compile(r"^\s*[-*] ")
+OPTIONAL_FINAL_PERIOD_RE = re.compile(r"\.?$")
+POLISHED_ENDING_RE = re.compile(r"\n*(In conclusion|Ultimately)[^\n]*$", re.IGNORECASE)
+
+LLM_GREETING_RE = re.compile(r"^(?:hi|hello|hey|dear|greetings)[^\n]*\n+", re.IGNORECASE)
+LLM_SIGNOFF_RE = re.compile(r"\n\s*(best regards|regards|sincerely|thanks|thank you)[^\n]*$", re.IGNORECASE)
+SIGNATURE_EMAIL_RE = re.compile(r"@|mailto:", re.IGNORECASE)
+SIGNATURE_PHONE_RE = re.compile(r"\+\d|\(\d{3}\)")
+SIGNATURE_NAME_RE = re.compile(r"mavericksedge|founder|bezal", re.IGNORECASE)
+SENTENCE_END_RE = re.compile(r"[.!?]\s*$")
+MARKDOWN_BOLD_RE = re.compile(r"(\*\*|__)(.*?)\1")
+MARKDOWN_ITALIC_RE = re.compile(r"(\*|_)(.*?)\1")
+LIST_MARKER_RE = re.compile(r"^\s*([\-*•]|\d+\.)\s+")
+PARAGRAPH_SPLIT_RE = re.compile(r"\n\n+")
+WHITESPACE_RE = re.compile(r"\s+")
+
+
+@functools.lru_cache(maxsize=32)
+def _humanize_lexical_re(brands: Tuple[str, ...]) -> "re.Pattern[str]":
+    """One scanner for stock phrases, exuberant adjectives and the given brands."""
+    alternatives = [
+        r"(?P<phrase>\b(?:" + "|".join(HUMANIZE_STOCK_PHRASES) + r")\b)",
+        r"(?P<exuberant>(?<![\"'])\b(?:" + "|".join(HUMANIZE_EXUBERANT_WORDS) + r")\b(?![\"']))",
+    ]
+    if brands:
+        alternatives.append(r"(?P<brand>(?-i:\b(?:" + "|".join(re.escape(b) for b in brands) + r")\b))")
+    return re.compile("|".join(alternatives), re.IGNORECASE)
+
+
+def _lexical_replacement(match: "re.Match[str]") -> str:
+    return HUMANIZE_LEXICAL_REPLACEMENTS[match.lastgroup]
+
+
+def _contraction_replacement(match: "re.Match[str]") -> str:
+    return HUMANIZE_CONTRACTIONS[match.lastgroup]
+
+
+def _vary_bullet_block(bullets: List[str]) -> List[str]:
+    # Trim to 2-4 uneven bullets: end the first with a period and the second with an ellipsis
+    processed = bullets[:]
+    if len(processed) > 4:
+        processed = processed[:3]
+    if processed:
+        processed[0] = OPTIONAL_FINAL_PERIOD_RE.sub(".", processed[0])
+    if len(processed) >= 2:
+        processed[1] = OPTIONAL_FINAL_PERIOD_RE.sub("…", processed[1])
+    return processed
+
+
+def _vary_bullets(text: str) -> str:
+    # Vary bullets: trim to 2-4 uneven bullets and vary lengths
+    lines = text.splitlines()
+    in_bullets = False
+    bullets: list[str] = []
+    start_idx = -1
+    for i, ln in enumerate(lines):
+        if DASH_BULLET_RE.match(ln):
+            if not in_bullets:
+                in_bullets = True
+                start_idx = i
+            bullets.append(ln)
+        else:
+            if in_bullets:
+                lines[start_idx:i] = _vary_bullet_block(bullets)
+                # reset
+                bullets = []
+                in_bullets = False
+
+    if in_bullets:
+        lines[start_idx:] = _vary_bullet_block(bullets)
+
+    return "\n".join(lines)
+
+
+def _humanize(text: str, query_text: str = "") -> str:
+    """Post-process a model draft to avoid AI telltales; returns the input if nothing is left."""
+    original = text
+    # Drafts that already follow the style rules only need the sentence-level passes
+    rewrite = text.endswith("\n") or HUMANIZE_QUICK_CHECK_RE.search(text) is not None
+    if rewrite:
+        # One pass drops stock phrases, tones down over-enthusiastic adjectives unless part of
+        # a quote, and replaces brand-name clichés that are not present in the query
+        query_lower = (query_text or "").lower()
+        brands = tuple(b for b in HUMANIZE_BIG_BRANDS if b.lower() not in query_lower)
+        text = _humanize_lexical_re(brands).sub(_lexical_replacement, text)
+
+    # Remove near-duplicate consecutive sentences to fight restating
+    # Preserve paragraph structure by splitting on double newlines first
+    paragraphs = text.split('\n\n')
+    processed_paragraphs = []
+
+    for para in paragraphs:
+        sentences = SENTENCE_SPLIT_RE.split(para)
+        dedup: list[str] = []
+        seen = set()
+        for s in sentences:
+            key = " ".join(s.lower().translate(NON_WORD_TO_SPACE).split())
+            if key and key not in seen:
+                dedup.append(s)
+                seen.add(key)
+        if len(dedup) >= 2:
+            processed_paragraphs.append(" ".join(dedup))
+        else:
+            processed_paragraphs.append(para)
+
+    text = "\n\n".join(processed_paragraphs)
+
+    if rewrite:
+        # Remove ALL em dashes - replace with "to" for ranges or commas for pauses
+        text = EM_DASH_RANGE_RE.sub(r'\1 to \2', text)  # Replace number ranges like "6—12" with "6 to 12"
+        text = text.replace("—", ", ")  # Replace remaining em dashes with commas
+        text = _vary_bullets(text)
+        # Encourage contractions
+        text = HUMANIZE_CONTRACTIONS_RE.sub(_contraction_replacement, text)
+
+    # Insert one short punchy sentence near the top if too uniform
+    sentences = SENTENCE_SPLIT_RE.split(text)
+    if 2 <= len(sentences) <= 8:
+        avg = sum(len(s) for s in sentences) / max(1, len(sentences))
+        if all(10 < len(s) < 220 for s in sentences) and avg > 80:
+            sentences.insert(1, "Quick take: here’s the gist.")
+            text = " ".join(s.strip() for s in sentences)
+
+    if rewrite:
+        # Remove overly polished endings
+        text = POLISHED_ENDING_RE.sub("", text)
+    return text.strip() or original
+
+
+def _strip_llm_greeting(text: str) -> str:
+    t = text.lstrip()
+    # Remove up to two leading greeting lines like "Hi ...,"/"Hello ..."/"Dear ..."
+    for _ in range(2):
+        m = LLM_GREETING_RE.match(t)
+        if not m:
+            break
+        t = t[m.end():]
+    return t.lstrip()
+
+
+def _is_signature_line(ln: str) -> bool:
+    markers = 0
+    if SIGNATURE_EMAIL_RE.search(ln):
+        markers += 1
+    if SIGNATURE_PHONE_RE.search(ln):
+        markers += 1
+    if SIGNATURE_NAME_RE.search(ln):
+        markers += 1
+    # Very short non-sentence lines are often signature lines
+    if len(ln.strip()) <= 60 and not SENTENCE_END_RE.search(ln):
+        markers += 0
+    return markers >= 2
+
+
+def _strip_llm_signature(text: str) -> str:
+    t = text.rstrip()
+    # Remove common sign-off blocks starting with regards/sincerely/etc to end
+    signoff = LLM_SIGNOFF_RE.search(t)
+    if signoff:
+        t = t[: signoff.start()].rstrip()
+    # Drop only clearly signature-like trailing lines without nuking body
+    tail = t.splitlines()
+    i = len(tail) - 1
+    while i >= 0 and _is_signature_line(tail[i]):
+        i -= 1
+    # Do not drop the only line of content
+    if i < 0:
+        return t
+    return "\n".join(tail[: i + 1]).rstrip()
+
+
+def _remove_markdown_and_bullets(text: str) -> str:
+    # Remove bold/italics markers
+    t = MARKDOWN_BOLD_RE.sub(r"\2", text)
+    t = MARKDOWN_ITALIC_RE.sub(r"\2", t)
+    # Strip list markers and collapse runs of blank lines in one pass over the lines
+    lines: List[str] = []
+    previous_blank = False
+    for ln in t.splitlines():
+        ln = LIST_MARKER_RE.sub("", ln, count=1)
+        if not ln or ln.isspace():
+            if not previous_blank:
+                lines.append("")
+            previous_blank = True
+            continue
+        lines.append(ln)
+        previous_blank = False
+    return "\n".join(lines).strip()
+
+
+def _limit_to_two_paragraphs(text: str) -> str:
+    paras = [p.strip() for p in PARAGRAPH_SPLIT_RE.split(text) if p.strip()]
+    if not paras:
+        return text.strip()
+    # Ensure exactly two paragraphs. If one, split roughly in half by sentence boundary.
+    if len(paras) == 1:
+        sentences = SENTENCE_SPLIT_RE.split(paras[0])
+        if len(sentences) >= 2:
+            cut = max(1, len(sentences) // 2)
+            first = " ".join(sentences[:cut]).strip()
+            second = " ".join(sentences[cut:]).strip()
+            return (first + "\n\n" + second).strip()
+        return paras[0]
+    if len(paras) == 2:
+        return "\n\n".join(paras)
+    # If more than 2, keep first; merge the rest into the second, normalize spaces
+    merged_second = paras[1] + " " + " ".join(paras[2:])
+    return paras[0] + "\n\n" + WHITESPACE_RE.sub(" ", merged_second).strip()
+
+
 @retry(reraise=True, stop=stop_after_attempt(4), wait=wait_exponential(min=2, max=20))
 def generate_draft_with_gemini(parsed: ParsedRequest) -> Tuple[str, str]:
     if not GEMINI_API_KEY:
         raise RuntimeError("GEMINI_API_KEY is not set")
-    genai.configure(api_key=GEMINI_API_KEY)
-    model = genai.GenerativeModel(GEMINI_MODEL)
 
     # Derive recipient first name from requester_name or sender
     first_name = ""
@@ -928,21 +1795,29 @@ def generate_draft_with_gemini(parsed: ParsedRequest) -> Tuple[str, str]:
         first_name = (parsed.sender or "").strip().split()[0]
 
     template = load_prompt_template()
-    prompt = interpolate_template(
-        template,
-        {
-            "subject": parsed.subject,
-            "sender": parsed.sender,
-            "sender_email": parsed.sender_email,
-            "first_name": first_name,
-            "deadline": parsed.deadline or "",
-            "requirements": parsed.requirements or "",
-            "query_text": parsed.query_text,
-        },
-    )
+    variables = {
+        "subject": parsed.subject,
+        "sender": parsed.sender,
+        "sender_email": parsed.sender_email,
+        "first_name": first_name,
+        "deadline": parsed.deadline or "",
+        "requirements": parsed.requirements or "",
+        "query_text": parsed.query_text,
+    }
 
     logger.info("Generating draft with Gemini model=%s", GEMINI_MODEL)
-    resp = model.generate_content(prompt)
+    static_prompt, input_template = split_prompt_template(template)
+    resp = None
+    cached_model = _get_cached_draft_model(static_prompt)
+    if cached_model is not None:
+        try:
+            resp = cached_model.generate_content(interpolate_template(input_template, variables))
+        except google_exceptions.NotFound:
+            # Cached content expired or was deleted server-side; recreate it on the next draft
+            logger.info("Gemini cached draft prompt not found; falling back to the full prompt")
+            _invalidate_cached_draft_model(static_prompt, cached_model)
+    if resp is None:
+        resp = _get_draft_model().generate_content(interpolate_template(template, variables))
     text = resp.text or ""
 
     # Expect JSON with subject/body; but handle plain text fallback
@@ -952,9 +1827,8 @@ def generate_draft_with_gemini(parsed: ParsedRequest) -> Tuple[str, str]:
         # Clean fenced code blocks if present
         cleaned = text.strip()
         if cleaned.startswith("```"):
-            cleaned = re.sub(r"^```(?:json)?\s*", "", cleaned)
-            cleaned = re.sub(r"\s*```$", "", cleaned)
-        data = json.loads(cleaned)
+            cleaned = cleaned.removeprefix("```json").removeprefix("```").removesuffix("```").strip()
+        data = orjson.loads(cleaned)
         subj = data.get("subject") or subj
         body = data.get("body") or body
     except Exception:
@@ -963,193 +1837,7 @@ def generate_draft_with_gemini(parsed: ParsedRequest) -> Tuple[str, str]:
     # LLM now handles greeting and signature - no system intervention needed
 
     # Post-process to humanize style and avoid AI telltales
-    def _humanize(text: str) -> str:
-        original = text
-        # Replace formulaic openers and stock phrases
-        replacements = {
-            r"\bIn today's (?:fast-paced|ever[- ]changing) world\b": "",
-            r"\bIt's no secret that\b": "",
-            r"\bAt the end of the day\b": "",
-            r"\bUltimately,\b": "",
-            r"\bIn conclusion,\b": "",
-            r"\bAdditionally,\b": "",
-            r"\bMoreover,\b": "",
-            r"\bOn the other hand,\b": "",
-            r"\bIt is important to note that\b": "",
-        }
-        for pat, rep in replacements.items():
-            text = re.sub(pat, rep, text, flags=re.IGNORECASE)
-
-        # Tone down over-enthusiastic adjectives unless part of a quote
-        exuberant = [
-            "incredible", "transformative", "exciting", "revolutionary", "game-changing",
-            "unprecedented", "amazing", "remarkable", "cutting-edge",
-        ]
-        for w in exuberant:
-            text = re.sub(rf"(?<![\"'])\b{w}\b(?![\"'])", "strong", text, flags=re.IGNORECASE)
-
-        # Reduce brand-name clichés if not present in the query
-        big_brands = ["Tesla", "Apple", "Google", "Amazon", "Microsoft"]
-        for b in big_brands:
-            if b.lower() not in (parsed.query_text or "").lower():
-                text = re.sub(rf"\b{re.escape(b)}\b", "a well-known player", text)
-
-        # Remove near-duplicate consecutive sentences to fight restating
-        # Preserve paragraph structure by splitting on double newlines first
-        paragraphs = text.split('\n\n')
-        processed_paragraphs = []
-        
-        for para in paragraphs:
-            sentences = re.split(r"(?<=[.!?])\s+", para)
-            dedup: list[str] = []
-            seen = set()
-            for s in sentences:
-                key = re.sub(r"\W+", " ", s.strip().lower())
-                key = " ".join(key.split())
-                if len(key) > 0 and key not in seen:
-                    dedup.append(s)
-                    seen.add(key)
-            if len(dedup) >= 2:
-                processed_paragraphs.append(" ".join(dedup))
-            else:
-                processed_paragraphs.append(para)
-        
-        text = "\n\n".join(processed_paragraphs)
-        
-        # Remove ALL em dashes - replace with "to" for ranges or commas for pauses
-        text = re.sub(r'(\d+)—(\d+)', r'\1 to \2', text)  # Replace number ranges like "6—12" with "6 to 12"
-        text = text.replace("—", ", ")  # Replace remaining em dashes with commas
-
-        # Vary bullets: trim to 2-4 uneven bullets and vary lengths
-        lines = text.splitlines()
-        in_bullets = False
-        bullets: list[str] = []
-        start_idx = -1
-        for i, ln in enumerate(lines):
-            if re.match(r"^\s*[-*] ", ln):
-                if not in_bullets:
-                    in_bullets = True
-                    start_idx = i
-                bullets.append(ln)
-            else:
-                if in_bullets:
-                    # process block
-                    processed = bullets[:]
-                    if len(processed) > 4:
-                        processed = processed[:3]
-                    # jitter: append ellipsis on one, shorten another
-                    if processed:
-                        processed[0] = re.sub(r"\.?$", ".", processed[0])
-                    if len(processed) >= 2:
-                        processed[1] = re.sub(r"\.?$", "…", processed[1])
-                    lines[start_idx:i] = processed
-                    # reset
-                    bullets = []
-                    in_bullets = False
-            
-        if in_bullets:
-            processed = bullets[:]
-            if len(processed) > 4:
-                processed = processed[:3]
-            if processed:
-                processed[0] = re.sub(r"\.?$", ".", processed[0])
-            if len(processed) >= 2:
-                processed[1] = re.sub(r"\.?$", "…", processed[1])
-            lines[start_idx:] = processed
-
-        text = "\n".join(lines)
-
-        # Encourage contractions
-        text = re.sub(r"\bdo not\b", "don't", text, flags=re.IGNORECASE)
-        text = re.sub(r"\bis not\b", "isn't", text, flags=re.IGNORECASE)
-        text = re.sub(r"\bwe are\b", "we're", text, flags=re.IGNORECASE)
-        text = re.sub(r"\bit is\b", "it's", text, flags=re.IGNORECASE)
-
-        # Insert one short punchy sentence near the top if too uniform
-        sentences = re.split(r"(?<=[.!?])\s+", text)
-        if 2 <= len(sentences) <= 8:
-            avg = sum(len(s) for s in sentences) / max(1, len(sentences))
-            if all(10 < len(s) < 220 for s in sentences) and avg > 80:
-                sentences.insert(1, "Quick take: here’s the gist.")
-                text = " ".join(s.strip() for s in sentences)
-
-        # Remove overly polished endings
-        text = re.sub(r"\n*(In conclusion|Ultimately)[^\n]*$", "", text, flags=re.IGNORECASE)
-        return text.strip() or original
-
-    body = _humanize(body)
-
-    # Normalize: strip LLM greeting/signature, enforce plain text 1–2 paragraphs, add closing and fixed signature
-    def _strip_llm_greeting(text: str) -> str:
-        t = text.lstrip()
-        # Remove up to two leading greeting lines like "Hi ...,"/"Hello ..."/"Dear ..."
-        for _ in range(2):
-            m = re.match(r"^(?:hi|hello|hey|dear|greetings)[^\n]*\n+", t, flags=re.IGNORECASE)
-            if not m:
-                break
-            t = t[m.end():]
-        return t.lstrip()
-
-    def _strip_llm_signature(text: str) -> str:
-        t = text.rstrip()
-        # Remove common sign-off blocks starting with regards/sincerely/etc to end
-        signoff = re.search(r"\n\s*(best regards|regards|sincerely|thanks|thank you)[^\n]*$", t, flags=re.IGNORECASE)
-        if signoff:
-            t = t[: signoff.start()].rstrip()
-        # Drop only clearly signature-like trailing lines without nuking body
-        tail = t.splitlines()
-        def is_signature_line(ln: str) -> bool:
-            markers = 0
-            if re.search(r"@|mailto:", ln, flags=re.IGNORECASE):
-                markers += 1
-            if re.search(r"\+\d|\(\d{3}\)", ln):
-                markers += 1
-            if re.search(r"mavericksedge|founder|bezal", ln, flags=re.IGNORECASE):
-                markers += 1
-            # Very short non-sentence lines are often signature lines
-            if len(ln.strip()) <= 60 and not re.search(r"[.!?]\s*$", ln):
-                markers += 0
-            return markers >= 2
-        i = len(tail) - 1
-        while i >= 0 and is_signature_line(tail[i]):
-            i -= 1
-        # Do not drop the only line of content
-        if i < 0:
-            return t
-        return "\n".join(tail[: i + 1]).rstrip()
-
-    def _remove_markdown_and_bullets(text: str) -> str:
-        # Remove bold/italics markers
-        t = re.sub(r"(\*\*|__)(.*?)\\1", r"\\2", text)
-        t = re.sub(r"(\*|_)(.*?)\\1", r"\\2", t)
-        # Convert bullets to plain sentences (strip markers)
-        lines = []
-        for ln in t.splitlines():
-            ln2 = re.sub(r"^\s*([\-*•]|\d+\.)\s+", "", ln)
-            lines.append(ln2)
-        t = "\n".join(lines)
-        # Collapse multiple blank lines
-        t = re.sub(r"\n\s*\n+", "\n\n", t)
-        return t.strip()
-
-    def _limit_to_two_paragraphs(text: str) -> str:
-        paras = [p.strip() for p in re.split(r"\n\n+", text) if p.strip()]
-        if not paras:
-            return text.strip()
-        # Ensure exactly two paragraphs. If one, split roughly in half by sentence boundary.
-        if len(paras) == 1:
-            sentences = re.split(r"(?<=[.!?])\s+", paras[0])
-            if len(sentences) >= 2:
-                cut = max(1, len(sentences) // 2)
-                first = " ".join(sentences[:cut]).strip()
-                second = " ".join(sentences[cut:]).strip()
-                return (first + "\n\n" + second).strip()
-            return paras[0]
-        if len(paras) == 2:
-            return "\n\n".join(paras)
-        # If more than 2, keep first; merge the rest into the second, normalize spaces
-        merged_second = paras[1] + " " + " ".join(paras[2:])
-        return paras[0] + "\n\n" + re.sub(r"\s+", " ", merged_second).strip()
+    body = _humanize(body, parsed.query_text)
 
     # Preserve LLM formatting verbatim (no post-processing)
     body = body
@@ -1281,9 +1969,8 @@ def generate_draft_with_gpt5(parsed: ParsedRequest) -> Tuple[str, str]:
     try:
         cleaned = text.strip()
         if cleaned.startswith("```"):
-            cleaned = re.sub(r"^```(?:json)?\s*", "", cleaned)
-            cleaned = re.sub(r"\s*```$", "", cleaned)
-        data = json.loads(cleaned)
+            cleaned = cleaned.removeprefix("```json").removeprefix("```").removesuffix("```").strip()
+        data = orjson.loads(cleaned)
         subj = data.get("subject") or subj
         body = data.get("body") or body
     except Exception:
@@ -1294,170 +1981,7 @@ def generate_draft_with_gpt5(parsed: ParsedRequest) -> Tuple[str, str]:
 
     # LLM now handles greeting and signature - no system intervention needed
 
-    def _humanize(text: str) -> str:
-        original = text
-        replacements = {
-            r"\bIn today's (?:fast-paced|ever[- ]changing) world\b": "",
-            r"\bIt's no secret that\b": "",
-            r"\bAt the end of the day\b": "",
-            r"\bUltimately,\b": "",
-            r"\bIn conclusion,\b": "",
-            r"\bAdditionally,\b": "",
-            r"\bMoreover,\b": "",
-            r"\bOn the other hand,\b": "",
-            r"\bIt is important to note that\b": "",
-        }
-        for pat, rep in replacements.items():
-            text = re.sub(pat, rep, text, flags=re.IGNORECASE)
-        exuberant = [
-            "incredible",
-            "transformative",
-            "exciting",
-            "revolutionary",
-            "game-changing",
-            "unprecedented",
-            "amazing",
-            "remarkable",
-            "cutting-edge",
-        ]
-        for w in exuberant:
-            text = re.sub(rf"(?<![\"'])\b{w}\b(?![\"'])", "strong", text, flags=re.IGNORECASE)
-        big_brands = ["Tesla", "Apple", "Google", "Amazon", "Microsoft"]
-        for b in big_brands:
-            if b.lower() not in (parsed.query_text or "").lower():
-                text = re.sub(rf"\b{re.escape(b)}\b", "a well-known player", text)
-        # Remove near-duplicate consecutive sentences to fight restating
-        # Preserve paragraph structure by splitting on double newlines first
-        paragraphs = text.split('\n\n')
-        processed_paragraphs = []
-        
-        for para in paragraphs:
-            sentences = re.split(r"(?<=[.!?])\s+", para)
-            dedup: list[str] = []
-            seen = set()
-            for s in sentences:
-                key = re.sub(r"\W+", " ", s.strip().lower())
-                key = " ".join(key.split())
-                if len(key) > 0 and key not in seen:
-                    dedup.append(s)
-                    seen.add(key)
-            if len(dedup) >= 2:
-                processed_paragraphs.append(" ".join(dedup))
-            else:
-                processed_paragraphs.append(para)
-        
-        text = "\n\n".join(processed_paragraphs)
-        
-        # Remove ALL em dashes - replace with "to" for ranges or commas for pauses
-        text = re.sub(r'(\d+)—(\d+)', r'\1 to \2', text)  # Replace number ranges like "6—12" with "6 to 12"
-        text = text.replace("—", ", ")  # Replace remaining em dashes with commas
-        lines = text.splitlines()
-        in_bullets = False
-        bullets: list[str] = []
-        start_idx = -1
-        for i, ln in enumerate(lines):
-            if re.match(r"^\s*[-*] ", ln):
-                if not in_bullets:
-                    in_bullets = True
-                    start_idx = i
-                bullets.append(ln)
-            else:
-                if in_bullets:
-                    processed = bullets[:]
-                    if len(processed) > 4:
-                        processed = processed[:3]
-                    if processed:
-                        processed[0] = re.sub(r"\.?$", ".", processed[0])
-                    if len(processed) >= 2:
-                        processed[1] = re.sub(r"\.?$", "…", processed[1])
-                    lines[start_idx:i] = processed
-                    bullets = []
-                    in_bullets = False
-        if in_bullets:
-            processed = bullets[:]
-            if len(processed) > 4:
-                processed = processed[:3]
-            if processed:
-                processed[0] = re.sub(r"\.?$", ".", processed[0])
-            if len(processed) >= 2:
-                processed[1] = re.sub(r"\.?$", "…", processed[1])
-            lines[start_idx:] = processed
-        text = "\n".join(lines)
-        text = re.sub(r"\bdo not\b", "don't", text, flags=re.IGNORECASE)
-        text = re.sub(r"\bis not\b", "isn't", text, flags=re.IGNORECASE)
-        text = re.sub(r"\bwe are\b", "we're", text, flags=re.IGNORECASE)
-        text = re.sub(r"\bit is\b", "it's", text, flags=re.IGNORECASE)
-        sentences = re.split(r"(?<=[.!?])\s+", text)
-        if 2 <= len(sentences) <= 8:
-            avg = sum(len(s) for s in sentences) / max(1, len(sentences))
-            if all(10 < len(s) < 220 for s in sentences) and avg > 80:
-                sentences.insert(1, "Quick take: here’s the gist.")
-                text = " ".join(s.strip() for s in sentences)
-        text = re.sub(r"\n*(In conclusion|Ultimately)[^\n]*$", "", text, flags=re.IGNORECASE)
-        return text.strip() or original
-
-    body = _humanize(body)
-
-    def _strip_llm_greeting(text: str) -> str:
-        t = text.lstrip()
-        for _ in range(2):
-            m = re.match(r"^(?:hi|hello|hey|dear|greetings)[^\n]*\n+", t, flags=re.IGNORECASE)
-            if not m:
-                break
-            t = t[m.end():]
-        return t.lstrip()
-
-    def _strip_llm_signature(text: str) -> str:
-        t = text.rstrip()
-        signoff = re.search(r"\n\s*(best regards|regards|sincerely|thanks|thank you)[^\n]*$", t, flags=re.IGNORECASE)
-        if signoff:
-            t = t[: signoff.start()].rstrip()
-        tail = t.splitlines()
-        def is_signature_line(ln: str) -> bool:
-            markers = 0
-            if re.search(r"@|mailto:", ln, flags=re.IGNORECASE):
-                markers += 1
-            if re.search(r"\+\d|\(\d{3}\)", ln):
-                markers += 1
-            if re.search(r"mavericksedge|founder|bezal", ln, flags=re.IGNORECASE):
-                markers += 1
-            if len(ln.strip()) <= 60 and not re.search(r"[.!?]\s*$", ln):
-                markers += 0
-            return markers >= 2
-        i = len(tail) - 1
-        while i >= 0 and is_signature_line(tail[i]):
-            i -= 1
-        if i < 0:
-            return t
-        return "\n".join(tail[: i + 1]).rstrip()
-
-    def _remove_markdown_and_bullets(text: str) -> str:
-        t = re.sub(r"(\*\*|__)(.*?)\\1", r"\\2", text)
-        t = re.sub(r"(\*|_)(.*?)\\1", r"\\2", t)
-        lines = []
-        for ln in t.splitlines():
-            ln2 = re.sub(r"^\s*([\-*•]|\d+\.)\s+", "", ln)
-            lines.append(ln2)
-        t = "\n".join(lines)
-        t = re.sub(r"\n\s*\n+", "\n\n", t)
-        return t.strip()
-
-    def _limit_to_two_paragraphs(text: str) -> str:
-        paras = [p.strip() for p in re.split(r"\n\n+", text) if p.strip()]
-        if not paras:
-            return text.strip()
-        if len(paras) == 1:
-            sentences = re.split(r"(?<=[.!?])\s+", paras[0])
-            if len(sentences) >= 2:
-                cut = max(1, len(sentences) // 2)
-                first = " ".join(sentences[:cut]).strip()
-                second = " ".join(sentences[cut:]).strip()
-                return (first + "\n\n" + second).strip()
-            return paras[0]
-        if len(paras) == 2:
-            return "\n\n".join(paras)
-        merged_second = paras[1] + " " + " ".join(paras[2:])
-        return paras[0] + "\n\n" + re.sub(r"\s+", " ", merged_second).strip()
+    body = _humanize(body, parsed.query_text)
 
     # Preserve LLM formatting verbatim (no post-processing)
     body = body
@@ -1480,32 +2004,29 @@ def save_draft(request_id: int, subject: str, body: str, model_used: str) -> int
     logger.info("save_draft: Saving draft for request_id %d", request_id)
     if request_id == 0:
         logger.error("save_draft: request_id is 0! This will cause database issues.")
-    now = dt.datetime.now(dt.timezone.utc).isoformat()
-    
-    with _db_lock:
-        conn = get_db_connection()
-        try:
-            cur = conn.cursor()
-            cur.execute(
-                """
-                INSERT INTO drafts (request_id, subject, body, model, approved, created_at, updated_at)
-                VALUES (?, ?, ?, ?, 0, ?, ?)
-                """,
-                (request_id, subject, body, model_used, now, now),
-            )
-            draft_id = cur.lastrowid
-            cur.execute(
-                "UPDATE requests SET status=?, updated_at=? WHERE id=?",
-                ("drafted", now, request_id),
-            )
-            conn.commit()
-            logger.info("save_draft: Created draft with ID %d for request_id %d", draft_id, request_id)
-            return draft_id
-        finally:
-            conn.close()
+    now = _now_iso()
     
-    # Log action outside of database transaction to avoid potential deadlocks
-    log_action(request_id, "draft_created", json.dumps({"draft_id": draft_id}))
+    def _insert_draft(conn: sqlite3.Connection) -> int:
+        cur = conn.cursor()
+        cur.execute(
+            """
+            INSERT INTO drafts (request_id, subject, body, model, approved, created_at, updated_at)
+            VALUES (?, ?, ?, ?, 0, ?, ?)
+            """,
+            (request_id, subject, body, model_used, now, now),
+        )
+        draft_id = cur.lastrowid
+        cur.execute(
+            "UPDATE requests SET status=?, updated_at=? WHERE id=?",
+            ("drafted", now, request_id),
+        )
+        # Logged in the same transaction as the draft itself (one commit per saved draft)
+        _insert_action(conn, request_id, "draft_created", _json_dumps({"draft_id": draft_id}), now)
+        return draft_id
+
+    draft_id = db_write(_insert_draft)
+    logger.info("save_draft: Created draft with ID %d for request_id %d", draft_id, request_id)
+    return draft_id
 
 
 # ------------------------------
@@ -1513,34 +2034,59 @@ def save_draft(request_id: int, subject: str, body: str, model_used: str) -> int
 # ------------------------------
 
 
-def build_review_message_text(parsed: ParsedRequest, subject: str, body: str) -> str:
+def _join_for_telegram(pieces: Tuple[str, ...]) -> str:
+    """Join message pieces, truncated to fit one Telegram message.
+
+    Oversize messages are cut while joining, so the full text is never built just to be sliced.
+    """
+    if sum(map(len, pieces)) <= MAX_TELEGRAM_MESSAGE_CHARS:
+        return "".join(pieces)
+    budget = MAX_TELEGRAM_MESSAGE_CHARS - 100
+    kept: List[str] = []
+    for piece in pieces:
+        if len(piece) >= budget:
+            kept.append(piece[:budget])
+            break
+        kept.append(piece)
+        budget -= len(piece)
+    kept.append(TELEGRAM_TRUNCATION_SUFFIX)
+    return "".join(kept)
+
+
+def _build_review_message_text_with_gemini(parsed: ParsedRequest, subject: str, body: str) -> str:
     # Secondary message content: AI analysis (trimmed) + Proposed draft
 
     # Add Gemini analysis info if available (trim to 2 sentences)
     gemini_info = ""
-    if USE_GEMINI_FILTERING and hasattr(parsed, 'gemini_analysis'):
+    if hasattr(parsed, 'gemini_analysis'):
         analysis = parsed.gemini_analysis
         reasoning = analysis['reasoning']
         # Keep only first two sentences and <= 30 words
-        parts = re.split(r"(?<=[.!?])\s+", reasoning)
+        parts = SENTENCE_SPLIT_RE.split(reasoning, 2)
         trimmed = " ".join(parts[:2]).strip()
-        words = trimmed.split()
+        words = trimmed.split(None, 30)
         if len(words) > 30:
             trimmed = " ".join(words[:30]).rstrip() + "…"
+        # A runaway topics list must not crowd the draft out of the message
+        topics = ", ".join((analysis.get('matching_topics') or ())[:MAX_REVIEW_TOPICS])
         gemini_info = (
             f"🧠 AI Analysis: {trimmed}\n"
             f"📊 Relevance Score: {analysis['relevance_score']:.2f}\n"
-            f"🎯 Topics: {', '.join(analysis['matching_topics'])}\n\n"
+            f"🎯 Topics: {topics}\n\n"
         )
 
-    draft = f"Proposed Subject:\n{subject}\n\nProposed Body:\n{body}"
-    text = gemini_info + draft
+    return _join_for_telegram((gemini_info, "Proposed Subject:\n", subject, "\n\nProposed Body:\n", body))
+
+
+def _build_review_message_text_plain(parsed: ParsedRequest, subject: str, body: str) -> str:
+    # Secondary message content without Gemini filtering: just the proposed draft
+    return _join_for_telegram(("Proposed Subject:\n", subject, "\n\nProposed Body:\n", body))
 
-    # Telegram max length constraint handling
-    if len(text) <= MAX_TELEGRAM_MESSAGE_CHARS:
-        return text
-    truncated = text[: MAX_TELEGRAM_MESSAGE_CHARS - 100] + "\n\n…[truncated]"
-    return truncated
+
+# Chosen once at import: USE_GEMINI_FILTERING is fixed for the life of the process
+build_review_message_text = (
+    _build_review_message_text_with_gemini if USE_GEMINI_FILTERING else _build_review_message_text_plain
+)
 
 
 def build_query_only_message_text(parsed: ParsedRequest) -> str:
@@ -1551,11 +2097,13 @@ def build_query_only_message_text(parsed: ParsedRequest) -> str:
     media_info = f"Media Outlet: {parsed.media_outlet}\n" if parsed.media_outlet else ""
     reply_to_info = f"Reply-to: {parsed.reply_to}\n" if parsed.reply_to else ""
     header = (
-        f"🤖 AI-Powered Source Request\n"
+        "🤖 AI-Powered Source Request\n"
         f"{provider_info}{name_info}{category_info}{media_info}From: {parsed.sender} <{parsed.sender_email}>\n"
         f"{reply_to_info}Deadline: {parsed.deadline or 'n/a'}\n\n"
+        "Query:\n"
     )
-    return header + f"Query:\n{parsed.query_text}"
+    # Very long queries are cut to one Telegram message instead of failing the send
+    return _join_for_telegram((header, parsed.query_text))
 
 
 def review_keyboard(request_id: int) -> InlineKeyboardMarkup:
@@ -1565,6 +2113,24 @@ def review_keyboard(request_id: int) -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup([[approve], [edit], [reject]])
 
 
+def record_review_sent(request_id: int, message_id: int) -> None:
+    """Store the review message, mark the request pending review and log it in one transaction."""
+    now = _now_iso()
+
+    def _record(conn: sqlite3.Connection) -> None:
+        conn.execute(
+            "INSERT INTO telegram_messages (request_id, chat_id, message_id, created_at) VALUES (?, ?, ?, ?)",
+            (request_id, str(TELEGRAM_CHAT_ID), message_id, now),
+        )
+        conn.execute(
+            "UPDATE requests SET status=?, updated_at=? WHERE id=?",
+            ("pending_review", now, request_id),
+        )
+        _insert_action(conn, request_id, "telegram_review_sent", _json_dumps({"message_id": message_id}), now)
+
+    db_write(_record)
+
+
 async def telegram_send_review(
     app, parsed: ParsedRequest, request_id: int, subject: str, body: str
 ) -> Optional[int]:
@@ -1591,23 +2157,11 @@ async def telegram_send_review(
             reply_markup=review_keyboard(request_id),
             reply_to_message_id=sent_query.message_id,
         )
-        db_execute(
-            "INSERT INTO telegram_messages (request_id, chat_id, message_id, created_at) VALUES (?, ?, ?, ?)",
-            (
-                request_id,
-                str(TELEGRAM_CHAT_ID),
-                int(sent.message_id),
-                dt.datetime.now(dt.timezone.utc).isoformat(),
-            ),
-        )
-        db_execute(
-            "UPDATE requests SET status=?, updated_at=? WHERE id=?",
-            ("pending_review", dt.datetime.now(dt.timezone.utc).isoformat(), request_id),
-        )
-        log_action(request_id, "telegram_review_sent", json.dumps({"message_id": sent.message_id}))
+        await asyncio.to_thread(record_review_sent, request_id, int(sent.message_id))
         return int(sent.message_id)
     except Exception as e:
         logger.exception("Failed to send review to Telegram: %s", e)
+        await asyncio.to_thread(log_action, request_id, "telegram_review_failed", str(e))
         return None
 
 
@@ -1631,6 +2185,18 @@ async def handle_callback(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
         await handle_edit(update, context, request_id)
 
 
+def record_draft_sent(request_id: int, draft_id: int) -> None:
+    """Mark the draft approved and the request sent, and log it, in one transaction."""
+    now = _now_iso()
+
+    def _record(conn: sqlite3.Connection) -> None:
+        conn.execute("UPDATE drafts SET approved=1, updated_at=? WHERE id=?", (now, draft_id))
+        conn.execute("UPDATE requests SET status=?, updated_at=? WHERE id=?", ("sent", now, request_id))
+        _insert_action(conn, request_id, "approved_and_sent", "", now)
+
+    db_write(_record)
+
+
 async def handle_approve(update: Update, context: ContextTypes.DEFAULT_TYPE, request_id: int) -> None:
     req = db_query_one("SELECT * FROM requests WHERE id=?", (request_id,))
     draft = db_query_one(
@@ -1667,29 +2233,24 @@ async def handle_approve(update: Update, context: ContextTypes.DEFAULT_TYPE, req
             return
 
     try:
-        service = await asyncio.to_thread(get_gmail_service)
         await asyncio.to_thread(
             send_email_reply,
-            service,
             req,
             draft["subject"],
             draft["body"],
         )
-        now = dt.datetime.now(dt.timezone.utc).isoformat()
-        db_execute("UPDATE drafts SET approved=1, updated_at=? WHERE id=?", (now, int(draft["id"])))
-        db_execute("UPDATE requests SET status=?, updated_at=? WHERE id=?", ("sent", now, request_id))
-        log_action(request_id, "approved_and_sent", "")
+        await asyncio.to_thread(record_draft_sent, request_id, int(draft["id"]))
         await update.effective_message.reply_text("✅ Sent reply via Gmail.")
     except Exception as e:
         logger.exception("Failed to send email: %s", e)
-        log_action(request_id, "send_failed", str(e))
+        await asyncio.to_thread(log_action, request_id, "send_failed", str(e))
         await update.effective_message.reply_text(f"❌ Failed to send: {e}")
 
 
 async def handle_reject(update: Update, context: ContextTypes.DEFAULT_TYPE, request_id: int) -> None:
     db_execute(
         "UPDATE requests SET status=?, updated_at=? WHERE id=?",
-        ("rejected", dt.datetime.now(dt.timezone.utc).isoformat(), request_id),
+        ("rejected", _now_iso(), request_id),
     )
     log_action(request_id, "rejected", "")
     await update.effective_message.reply_text("❌ Rejected. No reply will be sent.")
@@ -1740,7 +2301,7 @@ async def handle_edit_text(update: Update, context: ContextTypes.DEFAULT_TYPE) -
 
     db_execute(
         "UPDATE drafts SET subject=?, body=?, updated_at=? WHERE request_id=?",
-        (subject, body, dt.datetime.now(dt.timezone.utc).isoformat(), request_id),
+        (subject, body, _now_iso(), request_id),
     )
     db_execute("DELETE FROM pending_edits WHERE chat_id=? AND request_id=?", (chat_id, request_id))
     req = db_query_one("SELECT * FROM requests WHERE id=?", (request_id,))
@@ -1754,7 +2315,7 @@ async def handle_edit_text(update: Update, context: ContextTypes.DEFAULT_TYPE) -
             deadline=req["deadline"],
             requirements=req["requirements"],
             query_text=req["query_text"],
-            original_headers=json.loads(req["original_headers"]) if req["original_headers"] else {},
+            original_headers=load_original_headers(req["original_headers"]),
             gmail_message_id=req["gmail_message_id"],
             gmail_thread_id=req["gmail_thread_id"],
         )
@@ -1782,6 +2343,29 @@ async def handle_edit_text(update: Update, context: ContextTypes.DEFAULT_TYPE) -
 # ------------------------------
 
 
+SIGNATURE_BRAND_URL_RE = re.compile(
+    r"Founder\s*\|\s*Mavericks Edge\s*[—-]\s*https?://mavericksedge\.ca/?", re.IGNORECASE
+)
+SIGNATURE_BRAND_RE = re.compile(r"Founder\s*\|\s*Mavericks Edge")
+SIGNATURE_BRAND_LINK = "Founder | <a href=\"https://mavericksedge.ca/\">Mavericks Edge</a>"
+
+
+def _render_html_email_from_text(text: str) -> str:
+    # Remove URL from the signature line and hyperlink brand name instead
+    text = SIGNATURE_BRAND_URL_RE.sub("Founder | Mavericks Edge", text)
+    # Split paragraphs on blank lines
+    paragraphs = [p.strip() for p in PARAGRAPH_SPLIT_RE.split(text) if p.strip()]
+    html_parts: list[str] = []
+    for p in paragraphs:
+        esc = html_lib.escape(p)
+        # Linkify brand in signature line
+        esc = SIGNATURE_BRAND_RE.sub(SIGNATURE_BRAND_LINK, esc)
+        # Preserve single newlines inside a paragraph
+        esc = esc.replace("\n", "<br>")
+        html_parts.append(f"<p>{esc}</p>")
+    return "\n".join(html_parts) or f"<p>{html_lib.escape(text)}</p>"
+
+
 def build_reply_message(
     to_addr: str,
     from_addr: str,
@@ -1803,30 +2387,6 @@ def build_reply_message(
     msg.set_content(body)
 
     # HTML alternative with hyperlinked brand in signature
-    def _render_html_email_from_text(text: str) -> str:
-        # Remove URL from the signature line and hyperlink brand name instead
-        text = re.sub(
-            r"Founder\s*\|\s*Mavericks Edge\s*[—-]\s*https?://mavericksedge\.ca/?",
-            "Founder | Mavericks Edge",
-            text,
-            flags=re.IGNORECASE,
-        )
-        # Split paragraphs on blank lines
-        paragraphs = [p.strip() for p in re.split(r"\n\n+", text) if p.strip()]
-        html_parts: list[str] = []
-        for p in paragraphs:
-            esc = html_lib.escape(p)
-            # Linkify brand in signature line
-            esc = re.sub(
-                r"Founder\s*\|\s*Mavericks Edge",
-                "Founder | <a href=\"https://mavericksedge.ca/\">Mavericks Edge</a>",
-                esc,
-            )
-            # Preserve single newlines inside a paragraph
-            esc = esc.replace("\n", "<br>")
-            html_parts.append(f"<p>{esc}</p>")
-        return "\n".join(html_parts) or f"<p>{html_lib.escape(text)}</p>"
-
     html_body = _render_html_email_from_text(body)
     msg.add_alternative(html_body, subtype="html")
     return msg
@@ -1882,13 +2442,11 @@ def validate_email_address(email: str) -> str:
 
 @retry(reraise=True, stop=stop_after_attempt(5), wait=wait_exponential(min=2, max=30))
 def send_email_reply(
-    service: Any,
     req_row: sqlite3.Row,
     subject: str,
     body: str,
 ) -> None:
-    headers = json.loads(req_row["original_headers"]) if req_row["original_headers"] else {}
-    to_addr = validate_email_address(req_row["reply_to"])
+    headers = load_original_headers(req_row["original_headers"])
     try:
         to_addr = validate_email_address(req_row["reply_to"])
     except ValueError as e:
@@ -1917,7 +2475,7 @@ def send_email_reply(
         send_body["threadId"] = req_row["gmail_thread_id"]
 
     sent = (
-        service.users()
+        get_gmail_service().users()
         .messages()
         .send(userId="me", body=send_body)
         .execute()
@@ -1930,68 +2488,172 @@ def send_email_reply(
 # ------------------------------
 
 
-async def poll_gmail_and_process(app) -> None:
+_gmail_sync_lock: Optional[asyncio.Lock] = None
+_draft_semaphore: Optional[asyncio.Semaphore] = None
+
+
+def _get_gmail_sync_lock() -> asyncio.Lock:
+    """Serialize polls and push-triggered syncs so a message is never processed twice at once."""
+    global _gmail_sync_lock
+    if _gmail_sync_lock is None:
+        _gmail_sync_lock = asyncio.Lock()
+    return _gmail_sync_lock
+
+
+def _get_draft_semaphore() -> asyncio.Semaphore:
+    """Bound concurrent draft generation to DRAFT_CONCURRENCY (the LLM's rate limit is the ceiling)."""
+    global _draft_semaphore
+    if _draft_semaphore is None:
+        _draft_semaphore = asyncio.Semaphore(DRAFT_CONCURRENCY)
+    return _draft_semaphore
+
+
+async def _draft_and_review(app, parsed: ParsedRequest, request_id: int) -> None:
+    await asyncio.to_thread(log_action, request_id, "request_parsed", parsed.subject)
+    # Generate draft
+    logger.info("About to generate draft for request_id %d", request_id)
+    async with _get_draft_semaphore():
+        subject, body, model_used = await asyncio.to_thread(generate_draft, parsed)
+    logger.info("Generated draft for request_id %d, about to save", request_id)
+    await asyncio.to_thread(save_draft, request_id, subject, body, model_used)
+    logger.info("Saved draft for request_id %d, about to send to Telegram", request_id)
+    # Send to Telegram for review
+    logger.info("About to call telegram_send_review for request_id %d", request_id)
     try:
-        logger.info("Polling Gmail for unread emails with label '%s'", GMAIL_LABEL_NAME)
-        service = await asyncio.to_thread(get_gmail_service)
-        label_id = await asyncio.to_thread(gmail_get_label_id, service, GMAIL_LABEL_NAME)
-        ids = await asyncio.to_thread(gmail_list_messages, service, label_id, unread_only=True)
+        await telegram_send_review(app, parsed, request_id, subject, body)
+        logger.info("Successfully called telegram_send_review for request_id %d", request_id)
+    except Exception as e:
+        logger.exception("Failed to call telegram_send_review for request_id %d: %s", request_id, e)
+
+
+async def _process_message(app, mid: str, prefetched: Dict[str, Dict[str, Any]]) -> bool:
+    """Parse one email and draft every request in it; True when the email should be marked as read."""
+    logger.info("Processing email ID: %s", mid)
+    exists = await asyncio.to_thread(db_query_one, "SELECT id FROM requests WHERE gmail_message_id=?", (mid,))
+    if exists:
+        logger.info("Email %s already exists in database, but still unread in Gmail. Marking as read...", mid)
+        return True
+    try:
+        # Worker threads build their own Gmail service; the shared one is not thread-safe
+        msg = prefetched.get(mid) or await asyncio.to_thread(gmail_get_message, mid)
+        # Parsing runs the (blocking, rate-limited) Gemini filter, so keep it off the event loop
+        parsed_list = await asyncio.to_thread(parse_email_to_requests, msg)
         
-        if not ids:
-            logger.info("No unread emails found with label '%s'", GMAIL_LABEL_NAME)
-            return
+        if not parsed_list:
+            # Mark as read even if no relevant queries found
+            logger.info("Email %s has no relevant queries; marking as read", mid)
+            return True
             
-        logger.info("Found %d unread emails to process", len(ids))
-        for mid in ids:
-            logger.info("Processing email ID: %s", mid)
-            exists = db_query_one("SELECT id FROM requests WHERE gmail_message_id=?", (mid,))
-            if exists:
-                logger.info("Email %s already exists in database, but still unread in Gmail. Marking as read...", mid)
-                await asyncio.to_thread(gmail_mark_as_read, service, mid)
-                logger.info("Marked existing email %s as read", mid)
-                continue
-            try:
-                msg = await asyncio.to_thread(gmail_get_message, service, mid)
-                parsed_list = parse_email_to_requests(msg)
-                
-                if not parsed_list:
-                    # Mark as read even if no relevant queries found
-                    await asyncio.to_thread(gmail_mark_as_read, service, mid)
-                    logger.info("Marked email %s as read (no relevant queries found)", mid)
-                    continue
-                    
-                for parsed in parsed_list:
-                    request_id = upsert_request(parsed)
-                    log_action(request_id, "request_parsed", parsed.subject)
-                    # Generate draft
-                    logger.info("About to generate draft for request_id %d", request_id)
-                    subject, body, model_used = await asyncio.to_thread(generate_draft, parsed)
-                    logger.info("Generated draft for request_id %d, about to save", request_id)
-                    save_draft(request_id, subject, body, model_used)
-                    logger.info("Saved draft for request_id %d, about to send to Telegram", request_id)
-                    # Send to Telegram for review
-                    logger.info("About to call telegram_send_review for request_id %d", request_id)
-                    try:
-                        await telegram_send_review(app, parsed, request_id, subject, body)
-                        logger.info("Successfully called telegram_send_review for request_id %d", request_id)
-                    except Exception as e:
-                        logger.exception("Failed to call telegram_send_review for request_id %d: %s", request_id, e)
+        request_ids = await asyncio.to_thread(upsert_requests_bulk, parsed_list)
+        results = await asyncio.gather(
+            *(_draft_and_review(app, parsed, request_id) for parsed, request_id in zip(parsed_list, request_ids)),
+            return_exceptions=True,
+        )
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+        
+        # Mark email as read after processing all queries in it
+        logger.info("Processed %d queries from email %s; marking as read", len(parsed_list), mid)
+        return True
+    except Exception as e:
+        logger.exception("Failed processing message %s: %s", mid, e)
+        row = await asyncio.to_thread(db_query_one, "SELECT id FROM requests WHERE gmail_message_id=?", (mid,))
+        if row:
+            await asyncio.to_thread(
+                db_execute,
+                "UPDATE requests SET status=?, updated_at=? WHERE id=?",
+                ("error", _now_iso(), int(row["id"])),
+            )
+        return False
+
+
+async def process_gmail_messages(app, ids: List[str]) -> None:
+    # Fetch every message not seen before in as few HTTP round trips as possible
+    fresh_ids = await asyncio.to_thread(
+        lambda: [mid for mid in ids if not db_query_one("SELECT id FROM requests WHERE gmail_message_id=?", (mid,))]
+    )
+    prefetched = await asyncio.to_thread(gmail_get_messages_batch, fresh_ids) if fresh_ids else {}
+    # Messages (and the requests in each) are drafted concurrently, up to DRAFT_CONCURRENCY at a time
+    results = await asyncio.gather(*(_process_message(app, mid, prefetched) for mid in ids))
+    # Processed messages are marked as read in one batchModify call; failed ones stay unread for the next poll
+    read_ids = [mid for mid, mark_read in zip(ids, results) if mark_read]
+    if read_ids:
+        try:
+            await asyncio.to_thread(gmail_mark_as_read_bulk, read_ids)
+            logger.info("Marked %d emails as read", len(read_ids))
+        except Exception as e:
+            logger.exception("Failed to mark %d emails as read: %s", len(read_ids), e)
+
+
+async def poll_gmail_and_process(app) -> None:
+    try:
+        async with _get_gmail_sync_lock():
+            logger.info("Polling Gmail for unread emails with label '%s'", GMAIL_LABEL_NAME)
+            label_id = await asyncio.to_thread(gmail_get_label_id, GMAIL_LABEL_NAME)
+            ids = await asyncio.to_thread(gmail_list_messages, label_id, unread_only=True)
+            
+            if not ids:
+                logger.info("No unread emails found with label '%s'", GMAIL_LABEL_NAME)
+                return
                 
-                # Mark email as read after processing all queries in it
-                await asyncio.to_thread(gmail_mark_as_read, service, mid)
-                logger.info("Marked email %s as read after processing %d queries", mid, len(parsed_list))
-            except Exception as e:
-                logger.exception("Failed processing message %s: %s", mid, e)
-                row = db_query_one("SELECT id FROM requests WHERE gmail_message_id=?", (mid,))
-                if row:
-                    db_execute(
-                        "UPDATE requests SET status=?, updated_at=? WHERE id=?",
-                        ("error", dt.datetime.now(dt.timezone.utc).isoformat(), int(row["id"])),
-                    )
+            logger.info("Found %d unread emails to process", len(ids))
+            await process_gmail_messages(app, ids)
     except Exception as e:
         logger.exception("Polling failed: %s", e)
 
 
+async def sync_gmail_history(app) -> None:
+    """Process messages added since the last seen historyId (triggered by push notifications)."""
+    try:
+        async with _get_gmail_sync_lock():
+            start_history_id = get_state("gmail_history_id")
+            if not start_history_id:
+                logger.warning("No Gmail historyId stored yet; waiting for the watch to be registered")
+                return
+            label_id = await asyncio.to_thread(gmail_get_label_id, GMAIL_LABEL_NAME)
+            try:
+                ids, latest = await asyncio.to_thread(gmail_list_history, start_history_id, label_id)
+            except HttpError as e:
+                if getattr(e.resp, "status", None) != 404:
+                    raise
+                # History too old to replay: resync from unread mail and restart from the current historyId
+                logger.warning("Gmail historyId %s expired; falling back to a full unread scan", start_history_id)
+                latest = await asyncio.to_thread(gmail_get_history_id)
+                ids = await asyncio.to_thread(gmail_list_messages, label_id, unread_only=True)
+            
+            if ids:
+                logger.info("Gmail push: %d new emails with label '%s'", len(ids), GMAIL_LABEL_NAME)
+                await process_gmail_messages(app, ids)
+            set_state("gmail_history_id", latest)
+    except Exception as e:
+        logger.exception("Gmail history sync failed: %s", e)
+
+
+async def register_gmail_watch() -> None:
+    """Create or renew the Gmail watch; seeds the stored historyId on first registration."""
+    try:
+        label_id = await asyncio.to_thread(gmail_get_label_id, GMAIL_LABEL_NAME)
+        resp = await asyncio.to_thread(gmail_watch, label_id, GMAIL_PUBSUB_TOPIC)
+        if not get_state("gmail_history_id"):
+            set_state("gmail_history_id", str(resp["historyId"]))
+        logger.info("Gmail watch registered on '%s' (expires %s)", GMAIL_LABEL_NAME, resp.get("expiration"))
+    except Exception as e:
+        logger.exception("Failed to register Gmail watch: %s", e)
+
+
+def start_pubsub_listener(app, loop: asyncio.AbstractEventLoop) -> Any:
+    """Listen on the Pub/Sub subscription and schedule a history sync for every notification."""
+    subscriber = pubsub_v1.SubscriberClient()
+
+    def _on_message(message: Any) -> None:
+        message.ack()
+        asyncio.run_coroutine_threadsafe(sync_gmail_history(app), loop)
+
+    logger.info("Listening for Gmail push notifications on %s", GMAIL_PUBSUB_SUBSCRIPTION)
+    return subscriber.subscribe(GMAIL_PUBSUB_SUBSCRIPTION, callback=_on_message)
+
+
 # ------------------------------
 # Telegram Bot App
 # ------------------------------
@@ -2001,12 +2663,28 @@ async def start_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> N
     await update.message.reply_text("Bot running. Use inline buttons to review drafts.")
 
 
+async def _on_shutdown(app) -> None:  # type: ignore[no-untyped-def]
+    """Release background resources once polling has stopped."""
+    pubsub_future = app.bot_data.pop("gmail_pubsub_future", None)
+    if pubsub_future is not None:
+        pubsub_future.cancel()
+    await asyncio.to_thread(_gmail_fetch_executor.shutdown, wait=True, cancel_futures=True)
+    await asyncio.to_thread(close_db)
+    logger.info("Shutdown complete")
+
+
 def run_bot() -> None:
     if not TELEGRAM_BOT_TOKEN or not TELEGRAM_CHAT_ID:
         logger.error("TELEGRAM_BOT_TOKEN and TELEGRAM_CHAT_ID must be set in environment")
         sys.exit(1)
 
-    app = ApplicationBuilder().token(TELEGRAM_BOT_TOKEN).build()
+    app = (
+        ApplicationBuilder()
+        .token(TELEGRAM_BOT_TOKEN)
+        .rate_limiter(TelegramRateLimiter(max_retries=TELEGRAM_SEND_RETRIES))
+        .post_shutdown(_on_shutdown)
+        .build()
+    )
 
     # Handlers
     app.add_handler(CommandHandler("start", start_command))
@@ -2017,10 +2695,29 @@ def run_bot() -> None:
     async def poll_job(context: ContextTypes.DEFAULT_TYPE):
         await poll_gmail_and_process(app)
 
-    app.job_queue.run_repeating(poll_job, interval=POLL_INTERVAL_SECONDS, first=3)
+    poll_interval = POLL_INTERVAL_SECONDS
+    if GMAIL_PUBSUB_TOPIC and GMAIL_PUBSUB_SUBSCRIPTION:
+        if pubsub_v1 is None:
+            logger.warning("google-cloud-pubsub is not installed; falling back to Gmail polling")
+        else:
+            # Push mode: renew the watch before it expires and keep a slow poll for dropped notifications
+            async def watch_job(context: ContextTypes.DEFAULT_TYPE):
+                await register_gmail_watch()
+
+            async def listen_job(context: ContextTypes.DEFAULT_TYPE):
+                # Keep the streaming-pull future referenced for the lifetime of the bot
+                app.bot_data["gmail_pubsub_future"] = start_pubsub_listener(app, asyncio.get_running_loop())
+
+            app.job_queue.run_repeating(watch_job, interval=GMAIL_WATCH_RENEW_SECONDS, first=1)
+            app.job_queue.run_once(listen_job, when=2)
+            poll_interval = PUSH_FALLBACK_POLL_SECONDS
+
+    app.job_queue.run_repeating(poll_job, interval=poll_interval, first=3)
 
     logger.info("Starting Telegram bot polling…")
-    app.run_polling(close_loop=False)
+    # SIGINT/SIGTERM stop polling from inside the event loop, so pending updates, jobs and the
+    # post_shutdown cleanup still run before the process exits
+    app.run_polling(close_loop=False, stop_signals=(signal.SIGINT, signal.SIGTERM))
 
 
 # ------------------------------
@@ -2034,105 +2731,10 @@ def main() -> None:
         genai.configure(api_key=GEMINI_API_KEY)
     else:
         logger.warning("GEMINI_API_KEY not set; draft generation will fail until set.")
-
-    # Graceful shutdown on SIGINT/SIGTERM
-    def _handle_sig(signum, frame):  # type: ignore[no-untyped-def]
-        logger.info("Signal %s received, exiting…", signum)
-        sys.exit(0)
-
-    signal.signal(signal.SIGINT, _handle_sig)
-    signal.signal(signal.SIGTERM, _handle_sig)
+    start_gemini_filter_warmup()
 
     run_bot()
 
 
 if __name__ == "__main__":
     main()
-
-
-
-# Import Gemini filtering
-from gemini_filter import should_include_query_gemini, USE_GEMINI_FILTERING
-
-# Update the filtering function
-def _should_include_haro_query(blob: str) -> bool:
-    """Enhanced HARO query filtering with Gemini AI analysis."""
-    text = blob.lower()
-    
-    # If Gemini filtering is enabled, use AI analysis
-    if USE_GEMINI_FILTERING:
-        # Extract summary and category from the blob for better analysis
-        summary = ""
-        category = ""
-        
-        # Try to extract summary from common patterns
-        summary_match = re.search(r"Summary:\s*(.+?)(?:\n|$)", blob, re.IGNORECASE)
-        if summary_match:
-            summary = summary_match.group(1).strip()
-        
-        # Try to extract category
-        category_match = re.search(r"Category:\s*(.+?)(?:\n|$)", blob, re.IGNORECASE)
-        if category_match:
-            category = category_match.group(1).strip()
-        
-        # Use Gemini for intelligent analysis
-        is_relevant, analysis = should_include_query_gemini(blob, summary, category)
-        
-        logger.info(f"Gemini analysis result: {analysis['reasoning']}")
-        logger.info(f"Relevance score: {analysis['relevance_score']:.2f}, Confidence: {analysis['confidence']:.2f}")
-        
-        return is_relevant
-    
-    # Fallback to traditional keyword matching
-    if HARO_INCLUDE_KEYWORDS:
-        if not any(kw in text for kw in HARO_INCLUDE_KEYWORDS):
-            return False
-    if HARO_EXCLUDE_KEYWORDS:
-        if any(kw in text for kw in HARO_EXCLUDE_KEYWORDS):
-            return False
-    return True
-
-def build_review_message_text(parsed: ParsedRequest, subject: str, body: str) -> str:
-    """Enhanced review message with Gemini analysis results."""
-    # Enhanced header with more context
-    provider_info = f"Provider: {parsed.provider}\n" if parsed.provider else ""
-    category_info = f"Category: {parsed.category}\n" if parsed.category else ""
-    media_info = f"Media Outlet: {parsed.media_outlet}\n" if parsed.media_outlet else ""
-    
-    header = f"🤖 AI-Powered Source Request\n{provider_info}{category_info}{media_info}From: {parsed.sender} <{parsed.sender_email}>\nDeadline: {parsed.deadline or 'n/a'}\n\n"
-    
-    # Include summary if available
-    summary_info = f"Summary: {parsed.summary}\n\n" if parsed.summary else ""
-    
-    # Add Gemini analysis info if available
-    gemini_info = ""
-    if USE_GEMINI_FILTERING and hasattr(parsed, 'gemini_analysis'):
-        analysis = parsed.gemini_analysis
-        gemini_info = f"🧠 AI Analysis: {analysis['reasoning']}\n📊 Relevance Score: {analysis['relevance_score']:.2f}\n🎯 Topics: {', '.join(analysis['matching_topics'])}\n\n"
-    
-    draft = f"{summary_info}{gemini_info}Proposed Subject:\n{subject}\n\nProposed Body:\n{body}"
-    text = header + draft
-    
-    # Telegram max length constraint handling
-    if len(text) <= MAX_TELEGRAM_MESSAGE_CHARS:
-        return text
-    truncated = text[: MAX_TELEGRAM_MESSAGE_CHARS - 100] + "\n\n…[truncated]"
-    return truncated
-
-# Update the HARO parsing to include Gemini analysis
-def _parse_haro_queries_with_gemini(body_text: str) -> List[Dict[str, Optional[str]]]:
-    """Parse HARO digest email with Gemini analysis for each query."""
-    items = _parse_haro_queries(body_text)
-    
-    if USE_GEMINI_FILTERING:
-        for item in items:
-            # Analyze each query with Gemini
-            query_text = item.get("query", "")
-            summary = item.get("summary", "")
-            category = item.get("category", "")
-            
-            is_relevant, analysis = should_include_query_gemini(query_text, summary, category)
-            item["gemini_analysis"] = analysis
-            item["gemini_relevant"] = is_relevant
-    
-    return items
@@ -0,0 +1,107 @@
+"""
+Client-side rate limiting for Telegram Bot API requests.
+Bursts of review messages (one HARO digest can yield dozens of drafts) are spread out to
+stay under Telegram's flood limits, and a RetryAfter pauses every request until it expires.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Callable, Coroutine, Deque, Dict, Optional, Union
+
+from telegram.error import RetryAfter
+from telegram.ext import BaseRateLimiter
+
+logger = logging.getLogger("telegram_rate_limit")
+
+
+class WindowLimiter:
+    """Moving-window limiter with a fixed limit.
+
+    Telegram's flood limits are fixed per chat and overall, so unlike the adaptive Gemini
+    limiter this never changes its rate; RetryAfter is handled by the caller instead.
+    Used only from the bot's event loop, so it needs no lock.
+    """
+
+    def __init__(self, limit: int, window_seconds: float = 1.0):
+        self.limit = max(1, limit)
+        self.window_seconds = window_seconds
+        self._hits: Deque[float] = deque()
+
+    def reserve(self) -> float:
+        """Claim the next free slot and return how many seconds to wait before using it."""
+        now = time.monotonic()
+        while self._hits and self._hits[0] <= now - self.window_seconds:
+            self._hits.popleft()
+        if len(self._hits) < self.limit:
+            slot = now
+        else:
+            # The slot frees up one window after the request `limit` places back
+            slot = self._hits[-self.limit] + self.window_seconds
+        self._hits.append(max(slot, now))
+        return max(0.0, slot - now)
+
+
+class TelegramRateLimiter(BaseRateLimiter[None]):
+    """Overall and per-chat moving-window limits with RetryAfter handling."""
+
+    def __init__(self, overall_per_second: int = 30, per_chat_per_second: int = 1, max_retries: int = 3):
+        self.per_chat_per_second = per_chat_per_second
+        self.max_retries = max_retries
+        self._overall = WindowLimiter(overall_per_second)
+        self._chats: Dict[Union[int, str], WindowLimiter] = {}
+        self._retry_after_event = asyncio.Event()
+        self._retry_after_event.set()
+
+    async def initialize(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        pass
+
+    def _chat_limiter(self, chat_id: Union[int, str]) -> WindowLimiter:
+        limiter = self._chats.get(chat_id)
+        if limiter is None:
+            limiter = WindowLimiter(self.per_chat_per_second)
+            self._chats[chat_id] = limiter
+        return limiter
+
+    async def _acquire(self, chat_id: Optional[Union[int, str]]) -> None:
+        # Claim the chat slot first so one busy chat does not hold overall slots while it waits
+        if chat_id is not None:
+            delay = self._chat_limiter(chat_id).reserve()
+            if delay:
+                await asyncio.sleep(delay)
+        delay = self._overall.reserve()
+        if delay:
+            await asyncio.sleep(delay)
+
+    async def process_request(
+        self,
+        callback: Callable[..., Coroutine[Any, Any, Any]],
+        args: Any,
+        kwargs: Dict[str, Any],
+        endpoint: str,
+        data: Dict[str, Any],
+        rate_limit_args: Optional[None],
+    ) -> Any:
+        chat_id = data.get("chat_id")
+        for attempt in range(self.max_retries + 1):
+            await self._retry_after_event.wait()
+            await self._acquire(chat_id)
+            try:
+                return await callback(*args, **kwargs)
+            except RetryAfter as e:
+                if attempt >= self.max_retries:
+                    raise
+                retry_after = float(e.retry_after)
+                logger.warning(
+                    "Telegram flood limit hit on %s; pausing requests for %.1fs (attempt %d/%d)",
+                    endpoint, retry_after, attempt + 1, self.max_retries,
+                )
+                self._retry_after_event.clear()
+                try:
+                    await asyncio.sleep(retry_after)
+                finally:
+                    self._retry_after_event.set()